@@ -0,0 +1,185 @@
+"""
+Shared V3 scoring model for the probe scripts.
+
+probe_v3.py and probe_v3_deep.py both import their configuration, thinker
+expertise tables and scoring functions from here.
+"""
+
+import numpy as np
+
+# Numba is optional: without it the scoring core runs as plain Python/NumPy
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# V3 Configuration - calibrated to avoid ceiling saturation
+# Lower base rate allows bonuses/penalties to create meaningful spread
+V3_CONFIG = {
+    'base_success_rate': 0.35,      # Lowered from 0.45
+    'domain_match_bonus': 0.15,     # Reduced from 0.25
+    'relevance_bonus': 0.20,        # V3: for exponential decay
+    'confidence_weight': 0.20,      # Reduced from 0.3
+    'thinker_expertise_bonus': 0.15,
+    'disagreement_penalty': 0.10,
+    'difficulty_penalty': 0.08,
+    # V3 additions - these are the key causal fixes
+    'cross_domain_expert_penalty': 0.40,  # STRONG penalty for wrong-domain expert
+    'rank_decay_base': 0.5,               # Exponential: rank n gets bonus * 0.5^n
+    'causal_adversarial_rate': 0.15,      # 15% of domain mismatches forced to fail
+}
+
+# Scalar copies of the scoring weights, read once instead of per call;
+# JIT-compiled code can only read plain numeric globals, not dict entries
+_BASE_RATE = V3_CONFIG['base_success_rate']
+_DOMAIN_MATCH_BONUS = V3_CONFIG['domain_match_bonus']
+_CONFIDENCE_WEIGHT = V3_CONFIG['confidence_weight']
+_RELEVANCE_BONUS = V3_CONFIG['relevance_bonus']
+_RANK_DECAY_BASE = V3_CONFIG['rank_decay_base']
+_EXPERTISE_BONUS = V3_CONFIG['thinker_expertise_bonus']
+_DISAGREEMENT_PENALTY = V3_CONFIG['disagreement_penalty']
+_DIFFICULTY_PENALTY = V3_CONFIG['difficulty_penalty']
+_CROSS_DOMAIN_PENALTY = V3_CONFIG['cross_domain_expert_penalty']
+
+# Thinker expertise mapping
+THINKER_DOMAINS = {
+    'kent-beck': ['testing'],
+    'martin-fowler': ['architecture'],
+    'sam-newman': ['architecture'],
+    'fred-brooks': ['management'],
+    'brendan-gregg': ['performance', 'scaling'],
+    'bruce-schneier': ['security'],
+    'werner-vogels': ['scaling'],
+    'donald-knuth': ['performance'],
+    'michael-feathers': ['testing', 'architecture'],
+    'camille-fournier': ['management'],
+    'eric-evans': ['architecture'],
+}
+
+DOMAINS = ('architecture', 'testing', 'scaling', 'management', 'security', 'performance', 'database', 'devops')
+
+THINKER_KEYS = tuple(THINKER_DOMAINS)
+
+# EXPERT_MASK[t, d]: thinker THINKER_KEYS[t] is an expert in DOMAINS[d]
+EXPERT_MASK = np.array(
+    [[domain in THINKER_DOMAINS[thinker] for domain in DOMAINS] for thinker in THINKER_KEYS],
+    dtype=bool,
+)
+
+# Per-thinker reductions of EXPERT_MASK, indexed like THINKER_KEYS
+HAS_EXPERT = EXPERT_MASK.any(axis=1)
+HAS_WRONG_DOMAIN = ~EXPERT_MASK.all(axis=1)
+
+# STATE_TABLE[t, d]: expert state of a (thinker, domain) pair
+STATE_NEUTRAL, STATE_MATCH, STATE_CROSS = 0, 1, 2
+STATE_TABLE = np.where(
+    EXPERT_MASK,
+    STATE_MATCH,
+    np.where(HAS_EXPERT[:, None], STATE_CROSS, STATE_NEUTRAL),
+).astype(np.int8)
+
+
+# get_expert_domains memo, seeded with the canonical IDs; any other spelling
+# is resolved by substring scan on first use and cached
+_EMPTY_DOMAINS = frozenset()
+_EXPERT_CACHE = {key: frozenset(domains) for key, domains in THINKER_DOMAINS.items()}
+
+
+def get_expert_domains(thinker: str) -> frozenset:
+    """Get domains a thinker is expert in."""
+    expert_domains = _EXPERT_CACHE.get(thinker)
+    if expert_domains is None:
+        thinker_lower = thinker.lower().replace(' ', '-')
+        expert_domains = next(
+            (frozenset(domains) for key, domains in THINKER_DOMAINS.items() if key in thinker_lower),
+            _EMPTY_DOMAINS,
+        )
+        _EXPERT_CACHE[thinker] = expert_domains
+    return expert_domains
+
+
+def is_cross_domain_expert(thinker: str, question_domain: str) -> bool:
+    """Check if thinker is expert but in wrong domain."""
+    expert_domains = get_expert_domains(thinker)
+    return bool(expert_domains) and question_domain not in expert_domains
+
+
+def _v3_prob_core(expert_match: bool, cross_domain: bool, rank: int, confidence: float) -> float:
+    """V3 scoring arithmetic for one example, given its expert flags."""
+    prob = _BASE_RATE
+
+    # Pattern match (simplified: assume 50% match)
+    prob += _DOMAIN_MATCH_BONUS * 0.5
+
+    # Confidence
+    prob += confidence * _CONFIDENCE_WEIGHT
+
+    # Exponential rank decay
+    prob += _RELEVANCE_BONUS * (_RANK_DECAY_BASE ** rank)
+
+    # Domain alignment (simplified)
+    prob += _DOMAIN_MATCH_BONUS * 0.5
+
+    # Expert bonus/penalty
+    if expert_match:
+        prob += _EXPERTISE_BONUS
+    elif cross_domain:
+        prob -= _CROSS_DOMAIN_PENALTY
+
+    return max(0.05, min(0.95, prob))
+
+
+def _v3_prob_batch(
+    expert_flags: np.ndarray,
+    cross_flags: np.ndarray,
+    ranks: np.ndarray,
+    confs: np.ndarray,
+    out: np.ndarray,
+) -> np.ndarray:
+    """Score a batch into out; one compiled call for the whole batch."""
+    for i in range(out.shape[0]):
+        out[i] = _v3_prob_core(expert_flags[i], cross_flags[i], ranks[i], confs[i])
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _v3_prob_core = njit('float64(boolean, boolean, int64, float64)', cache=True, fastmath=True)(_v3_prob_core)
+    _v3_prob_batch = njit(cache=True, fastmath=True)(_v3_prob_batch)
+
+
+def calculate_v3_prob(thinker: str, domain: str, rank: int, confidence: float = 0.7) -> float:
+    """Calculate V3 predicted probability."""
+    expert_domains = get_expert_domains(thinker)
+    expert_match = domain in expert_domains
+    return _v3_prob_core(expert_match, bool(expert_domains) and not expert_match, rank, confidence)
+
+
+def calculate_v3_probs(
+    expert_match: np.ndarray,
+    cross_domain: np.ndarray,
+    rank: np.ndarray,
+    confidence: np.ndarray,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Vectorized calculate_v3_prob over per-example expert flags.
+
+    Scores are float32 (written into out if given): the result is a clamped
+    sum of a few small bonuses, well within single precision.
+    """
+    if out is None:
+        out = np.empty(len(rank), dtype=np.float32)
+
+    if NUMBA_AVAILABLE:
+        return _v3_prob_batch(expert_match, cross_domain, rank, confidence, out)
+
+    f32 = np.float32
+    prob = confidence.astype(f32) * f32(_CONFIDENCE_WEIGHT)
+    prob += f32(_BASE_RATE + _DOMAIN_MATCH_BONUS * 0.5)
+    prob += f32(_RELEVANCE_BONUS) * np.power(f32(_RANK_DECAY_BASE), rank, dtype=f32)
+    prob += f32(_DOMAIN_MATCH_BONUS * 0.5)
+    prob += np.where(expert_match, f32(_EXPERTISE_BONUS), f32(0.0))
+    prob -= np.where(cross_domain, f32(_CROSS_DOMAIN_PENALTY), f32(0.0))
+
+    return np.clip(prob, f32(0.05), f32(0.95), out=out)
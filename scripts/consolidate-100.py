@@ -15,6 +15,17 @@ import sqlite3
 from pathlib import Path
 from collections import defaultdict
 
+# orjson formats indented output in C; stdlib indent=2 goes through the pure-Python encoder
+try:
+    import orjson
+
+    def dump_canonical(obj: dict) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def dump_canonical(obj: dict) -> bytes:
+        # Raw UTF-8 like orjson, so both paths write identical bytes
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
 # Domain mapping: messy → clean
 DOMAIN_MAP = {
     # Software (20)
@@ -130,6 +141,10 @@ def main():
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
 
+    # Run every read inside one transaction: one lock acquisition and a
+    # consistent snapshot instead of autocommit per statement
+    conn.execute("BEGIN")
+
     # Get all thinkers with principle counts
     thinkers = conn.execute("""
         SELECT t.id, t.name, t.domain, t.background, t.profile_json,
@@ -170,27 +185,37 @@ def main():
 
     print(f"\n=== SELECTED: {len(selected)} thinkers ===")
 
-    # Clear existing JSON files
-    for domain_dir in output_dir.iterdir():
-        if domain_dir.is_dir():
-            for f in domain_dir.glob("*.json"):
-                f.unlink()
+    # Clear existing JSON files (scandir entries carry their type, so no extra stat per name)
+    with os.scandir(output_dir) as domain_entries:
+        for domain_entry in domain_entries:
+            if not domain_entry.is_dir():
+                continue
+            with os.scandir(domain_entry.path) as file_entries:
+                for entry in file_entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        os.unlink(entry.path)
 
     # Create domain directories
     for domain in TARGET.keys():
-        (output_dir / domain).mkdir(exist_ok=True)
+        (output_dir / domain).mkdir(parents=True, exist_ok=True)
+
+    # Get principles for the selected thinkers in one bound query, grouped by thinker
+    selected_ids = [t["id"] for _, t in selected]
+    placeholders = ",".join("?" * len(selected_ids))
+    principles_by_thinker = defaultdict(list)
+    for p in conn.execute(f"""
+        SELECT thinker_id, name, description, domain_tags
+        FROM principles
+        WHERE thinker_id IN ({placeholders})
+    """, selected_ids):
+        principles_by_thinker[p["thinker_id"]].append(p)
+    conn.commit()
 
     # Export each thinker
     exported = 0
     for domain, thinker in selected:
         thinker_id = thinker["id"]
-
-        # Get principles
-        principles = conn.execute("""
-            SELECT name, description, domain_tags
-            FROM principles
-            WHERE thinker_id = ?
-        """, (thinker_id,)).fetchall()
+        principles = principles_by_thinker.get(thinker_id, [])
 
         if not principles:
             print(f"  SKIP {thinker_id}: no principles")
@@ -229,8 +254,7 @@ def main():
 
         # Write file
         out_path = output_dir / domain / f"{thinker_id}.json"
-        with open(out_path, "w") as f:
-            json.dump(canonical, f, indent=2)
+        out_path.write_bytes(dump_canonical(canonical))
 
         exported += 1
 
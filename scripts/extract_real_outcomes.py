@@ -18,13 +18,43 @@ Usage:
 
 import argparse
 import json
+import math
+import mmap
+import os
 import random
+import re
 import sqlite3
 import sys
-from dataclasses import dataclass, asdict
+from array import array
+from bisect import bisect_right
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# orjson decodes and encodes several times faster than stdlib json
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    def dump_jsonl_line(obj: dict) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    json_loads = json.loads
+
+    def dump_jsonl_line(obj: dict) -> bytes:
+        return (json.dumps(obj) + '\n').encode()
+
+# pyahocorasick turns keyword detection into a single automaton pass
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 
 @dataclass
@@ -55,9 +85,30 @@ class TrainingExample:
     context_features: ContextFeatures
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d['context_features'] = asdict(self.context_features)
-        return d
+        # Built by hand: every field is a primitive, so asdict()'s recursive
+        # deepcopy walk is pure overhead on large exports.
+        ctx = self.context_features
+        return {
+            'id': self.id,
+            'question': self.question,
+            'domain': self.domain,
+            'difficulty': self.difficulty,
+            'principle_id': self.principle_id,
+            'principle_name': self.principle_name,
+            'thinker_id': self.thinker_id,
+            'position_rank': self.position_rank,
+            'confidence': self.confidence,
+            'success': self.success,
+            'reasoning': self.reasoning,
+            'context_features': {
+                'stakeholder': ctx.stakeholder,
+                'company_stage': ctx.company_stage,
+                'urgency': ctx.urgency,
+                'domain_match': ctx.domain_match,
+                'total_principles_selected': ctx.total_principles_selected,
+                'is_for_position': ctx.is_for_position,
+            },
+        }
 
 
 # Domain detection patterns
@@ -104,89 +155,175 @@ STAGE_KEYWORDS = {
 }
 
 
-def detect_domain(question: str) -> str:
-    """Detect the domain from question text."""
-    question_lower = question.lower()
-    scores = {}
+# Keyword tables by category, and the categories each text can vote for: the
+# question drives domain and urgency, the context drives stakeholder, urgency
+# and stage.
+KEYWORD_TABLES = {
+    'domain': DOMAIN_PATTERNS,
+    'stakeholder': STAKEHOLDER_KEYWORDS,
+    'urgency': URGENCY_KEYWORDS,
+    'stage': STAGE_KEYWORDS,
+}
 
-    for domain, patterns in DOMAIN_PATTERNS.items():
-        score = sum(1 for p in patterns if p in question_lower)
-        if score > 0:
-            scores[domain] = score
+TEXT_CATEGORIES = {
+    'question': ('domain', 'urgency'),
+    'context': ('stakeholder', 'urgency', 'stage'),
+}
 
-    if scores:
-        return max(scores, key=scores.get)
-    return 'architecture'  # Default
 
+def build_keyword_index(categories: Tuple[str, ...]) -> Dict[str, List[Tuple[str, str]]]:
+    """Map every keyword in the given categories to the (category, bucket) pairs it votes for."""
+    index = {}
+    for category in categories:
+        for bucket, keywords in KEYWORD_TABLES[category].items():
+            for kw in keywords:
+                index.setdefault(kw, []).append((category, bucket))
+    return index
 
-def detect_stakeholder(context_json: dict) -> str:
-    """Detect stakeholder from context."""
-    if not context_json:
-        return 'Tech Lead'
 
-    context_str = json.dumps(context_json).lower()
+# Short abbreviations that only count as whole words. As substrings they
+# false-trigger: 'em' in 'management', 'cto' in 'director', 'pm' in 'npm'.
+TOKEN_KEYWORDS = frozenset({'cto', 'ceo', 'em', 'pm', 'sre', 'tdd', 'mvp'})
+
+# Precompiled once at import, per text, so each text is only ever scanned for
+# keywords that can change one of its categories. Token keywords are matched
+# with one word-boundary alternation; everything else is a substring match.
+KEYWORD_INDEXES = {text: build_keyword_index(cats) for text, cats in TEXT_CATEGORIES.items()}
+
+SUBSTRING_KEYWORDS = {
+    text: tuple(kw for kw in index if kw not in TOKEN_KEYWORDS)
+    for text, index in KEYWORD_INDEXES.items()
+}
+
+TOKEN_PATTERNS = {
+    text: re.compile(r'\b(?:' + '|'.join(sorted(TOKEN_KEYWORDS.intersection(index))) + r')\b')
+    for text, index in KEYWORD_INDEXES.items()
+    if TOKEN_KEYWORDS.intersection(index)
+}
+
+# One alternation per domain for the per-principle domain_match check: on short
+# principle names a single regex search beats a generator of substring tests.
+DOMAIN_MATCH_REGEXES = {
+    domain: re.compile('|'.join(
+        rf'\b{re.escape(p)}\b' if p in TOKEN_KEYWORDS else re.escape(p)
+        for p in patterns
+    ))
+    for domain, patterns in DOMAIN_PATTERNS.items()
+}
+
+if AHOCORASICK_AVAILABLE:
+    KEYWORD_AUTOMATA = {}
+    for _text, _keywords in SUBSTRING_KEYWORDS.items():
+        _automaton = ahocorasick.Automaton()
+        for _kw in _keywords:
+            _automaton.add_word(_kw, _kw)
+        _automaton.make_automaton()
+        KEYWORD_AUTOMATA[_text] = _automaton
+
+
+def scan_keywords(text: str, kind: str) -> Dict[str, Dict[str, int]]:
+    """
+    Scan lowered text once and count distinct keyword hits.
+
+    kind is 'question' or 'context'. Returns {category: defaultdict(bucket -> hits)} for
+    every category in TEXT_CATEGORIES[kind].
+    """
+    index = KEYWORD_INDEXES[kind]
+    if AHOCORASICK_AVAILABLE:
+        found = {kw for _, kw in KEYWORD_AUTOMATA[kind].iter(text)}
+    else:
+        found = {kw for kw in SUBSTRING_KEYWORDS[kind] if kw in text}
+
+    token_pattern = TOKEN_PATTERNS.get(kind)
+    if token_pattern is not None:
+        found.update(token_pattern.findall(text))
+
+    scores = {category: defaultdict(int) for category in TEXT_CATEGORIES[kind]}
+    for kw in found:
+        for category, bucket in index[kw]:
+            scores[category][bucket] += 1
+
+    return scores
+
 
-    for stakeholder, keywords in STAKEHOLDER_KEYWORDS.items():
-        if any(kw in context_str for kw in keywords):
+@lru_cache(maxsize=4096)
+def scan_context(context_text: str) -> Dict[str, Dict[str, int]]:
+    """
+    Memoized context scan.
+
+    Agents tend to resend the same context with every question, so repeated
+    contexts reuse one scan. Callers must treat the result as read-only.
+    """
+    return scan_keywords(context_text, 'context')
+
+
+def detect_domain(question_hits: Dict[str, int]) -> str:
+    """Detect the domain from the question's keyword hits."""
+    # Ties resolve in DOMAIN_PATTERNS order
+    return max(
+        (d for d in DOMAIN_PATTERNS if d in question_hits),
+        key=question_hits.get,
+        default='architecture',
+    )
+
+
+def detect_stakeholder(context_hits: Optional[Dict[str, int]]) -> str:
+    """Detect stakeholder from context keyword hits (None when there is no context)."""
+    if context_hits is None:
+        return 'Tech Lead'
+
+    for stakeholder in STAKEHOLDER_KEYWORDS:
+        if stakeholder in context_hits:
             return stakeholder
 
     return 'Senior Engineer'
 
 
-def detect_urgency(question: str, context_json: dict) -> str:
-    """Detect urgency level."""
-    text = question.lower()
-    if context_json:
-        text += ' ' + json.dumps(context_json).lower()
+def detect_urgency(question_hits: Dict[str, int], context_hits: Optional[Dict[str, int]]) -> str:
+    """Detect urgency level from question and context keyword hits."""
+    context_hits = context_hits or {}
 
-    for urgency, keywords in URGENCY_KEYWORDS.items():
-        if any(kw in text for kw in keywords):
+    for urgency in URGENCY_KEYWORDS:
+        if urgency in question_hits or urgency in context_hits:
             return urgency
 
     return 'planning'
 
 
-def detect_company_stage(context_json: dict) -> str:
-    """Detect company stage from context."""
-    if not context_json:
+def detect_company_stage(context_hits: Optional[Dict[str, int]]) -> str:
+    """Detect company stage from context keyword hits (None when there is no context)."""
+    if context_hits is None:
         return 'growth-stage'
 
-    context_str = json.dumps(context_json).lower()
-
-    for stage, keywords in STAGE_KEYWORDS.items():
-        if any(kw in context_str for kw in keywords):
+    for stage in STAGE_KEYWORDS:
+        if stage in context_hits:
             return stage
 
     return 'growth-stage'
 
 
+# Question word-count boundaries between difficulty levels 1..5
+_WC_BOUNDS = (20, 40, 60, 100)
+
+
 def estimate_difficulty(question: str, counsel_json: dict) -> int:
     """Estimate difficulty from question complexity and counsel response."""
     # Base difficulty from question length and complexity
-    word_count = len(question.split())
-
-    if word_count < 20:
-        base = 1
-    elif word_count < 40:
-        base = 2
-    elif word_count < 60:
-        base = 3
-    elif word_count < 100:
-        base = 4
-    else:
-        base = 5
+    base = bisect_right(_WC_BOUNDS, len(question.split())) + 1
 
     # Adjust based on counsel complexity
     if counsel_json:
-        for_count = len(counsel_json.get('for', []))
-        against_count = len(counsel_json.get('against', []))
-
-        if for_count + against_count >= 8:
+        total = len(counsel_json.get('for', ())) + len(counsel_json.get('against', ()))
+        if total >= 8:
             base = min(5, base + 1)
 
     return base
 
 
+# Thinker names -> IDs: spaces become hyphens, apostrophes are dropped
+_THINKER_TRANS = str.maketrans({' ': '-', "'": None})
+
+
 def extract_principles_from_counsel(counsel_json: dict) -> List[Tuple[str, str, str, float, bool]]:
     """
     Extract principles from counsel JSON.
@@ -196,20 +333,23 @@ def extract_principles_from_counsel(counsel_json: dict) -> List[Tuple[str, str,
 
     for position in ['for', 'against']:
         is_for = position == 'for'
-        entries = counsel_json.get(position, [])
+        entries = counsel_json.get(position) or ()
 
         for idx, entry in enumerate(entries):
-            # Handle different counsel response formats
-            if isinstance(entry, dict):
-                principle_id = entry.get('id', entry.get('principle_id', f'p-{idx}'))
-                principle_name = entry.get('principle', entry.get('name', 'Unknown'))
-                thinker = entry.get('thinker', entry.get('source', 'Unknown'))
-                confidence = entry.get('confidence', entry.get('score', 0.5))
-            else:
+            # Handle different counsel response formats; well-formed counsel
+            # is all objects, so skip anything else on the rare miss
+            try:
+                get = entry.get
+            except AttributeError:
                 continue
 
+            principle_id = get('id', get('principle_id', f'p-{idx}'))
+            principle_name = get('principle', get('name', 'Unknown'))
+            thinker = get('thinker', get('source', 'Unknown'))
+            confidence = get('confidence', get('score', 0.5))
+
             # Normalize thinker to ID format
-            thinker_id = thinker.lower().replace(' ', '-').replace("'", '')
+            thinker_id = thinker.lower().translate(_THINKER_TRANS)
 
             principles.append((principle_id, principle_name, thinker_id, confidence, is_for))
 
@@ -219,7 +359,7 @@ def extract_principles_from_counsel(counsel_json: dict) -> List[Tuple[str, str,
 def decision_to_examples(
     decision_id: str,
     question: str,
-    context_json: dict,
+    context_text: str,
     counsel_json: dict,
     outcome_success: bool,
     outcome_notes: str
@@ -228,15 +368,19 @@ def decision_to_examples(
     Convert a single decision with outcome to training examples.
 
     Each principle mentioned in the counsel becomes a training example.
-    Success label propagates from the decision outcome.
+    Success label propagates from the decision outcome. context_text is the
+    lowered, serialized context JSON ('' when the decision has no context).
     """
     examples = []
 
-    # Detect context features
-    domain = detect_domain(question)
-    stakeholder = detect_stakeholder(context_json)
-    urgency = detect_urgency(question, context_json)
-    company_stage = detect_company_stage(context_json)
+    # Detect context features: one keyword scan per text
+    question_scores = scan_keywords(question.lower(), 'question')
+    context_scores = scan_context(context_text) if context_text else {}
+
+    domain = detect_domain(question_scores['domain'])
+    stakeholder = detect_stakeholder(context_scores.get('stakeholder'))
+    urgency = detect_urgency(question_scores['urgency'], context_scores.get('urgency'))
+    company_stage = detect_company_stage(context_scores.get('stage'))
     difficulty = estimate_difficulty(question, counsel_json)
 
     # Extract principles
@@ -246,14 +390,11 @@ def decision_to_examples(
         return examples
 
     total_principles = len(principles)
+    domain_regex = DOMAIN_MATCH_REGEXES[domain]
 
     for rank, (principle_id, principle_name, thinker_id, confidence, is_for) in enumerate(principles):
         # Domain match check
-        principle_lower = principle_name.lower()
-        domain_match = any(
-            pattern in principle_lower
-            for pattern in DOMAIN_PATTERNS.get(domain, [])
-        )
+        domain_match = domain_regex.search(principle_name.lower()) is not None
 
         # Success label logic:
         # - If outcome was success and principle was FOR: success
@@ -301,112 +442,234 @@ def decision_to_examples(
     return examples
 
 
-def extract_from_database(db_path: str) -> List[TrainingExample]:
-    """Extract training examples from decisions with recorded outcomes."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+def row_to_examples(row: tuple) -> List[TrainingExample]:
+    """Convert one (id, question, context_text, for_json, against_json,
+    outcome_success, outcome_notes) row from iter_examples' query."""
+    decision_id, question, context_text, for_json, against_json, outcome_success, outcome_notes = row
+    counsel_json = {
+        'for': json_loads(for_json) if for_json else [],
+        'against': json_loads(against_json) if against_json else [],
+    }
+
+    return decision_to_examples(
+        decision_id=decision_id,
+        question=question,
+        context_text=context_text or '',
+        counsel_json=counsel_json,
+        outcome_success=bool(outcome_success),
+        outcome_notes=outcome_notes or '',
+    )
+
+
+def rows_to_examples(rows: List[tuple]) -> Tuple[int, List[TrainingExample]]:
+    """Process-pool worker: convert a batch of rows, returning (row count, examples)."""
+    examples = []
+    for row in rows:
+        examples.extend(row_to_examples(row))
+    return len(rows), examples
 
+
+def iter_examples(
+    conn: sqlite3.Connection,
+    workers: int = 1,
+    batch_size: int = 500,
+) -> Iterator[TrainingExample]:
+    """
+    Stream training examples from decisions with recorded outcomes.
+
+    Args:
+        conn: Open connection to the 100minds database
+        workers: Worker processes for the detection phase (1 = in-process)
+        batch_size: Decisions per worker task
+
+    Yields:
+        TrainingExamples in decision order, regardless of worker count
+    """
+    conn.row_factory = None
+
+    # The extraction is one sequential scan: memory-map the file and give the
+    # page cache room (64 MiB) instead of going through read() per page
+    conn.execute("PRAGMA mmap_size = 268435456")
+    conn.execute("PRAGMA cache_size = -65536")
+
+    # Let SQLite's JSON1 extension validate the documents and project out the
+    # counsel arrays, so Python only decodes the fields it actually uses. The
+    # context is only ever keyword-scanned, so SQLite also serializes and
+    # lowercases it in the same pass; empty contexts come back as NULL.
     cursor = conn.execute("""
         SELECT
             id,
             question,
-            context_json,
-            counsel_json,
+            CASE
+                WHEN coalesce(json(nullif(context_json, '')), 'null')
+                     IN ('null', '{}', '[]', '""', 'false', '0') THEN NULL
+                ELSE lower(json(context_json))
+            END AS context_text,
+            CASE json_type(counsel_json, '$.for')
+                WHEN 'array' THEN json_extract(counsel_json, '$.for')
+            END AS for_json,
+            CASE json_type(counsel_json, '$.against')
+                WHEN 'array' THEN json_extract(counsel_json, '$.against')
+            END AS against_json,
             outcome_success,
             outcome_notes
         FROM decisions
         WHERE outcome_success IS NOT NULL
+          AND json_valid(counsel_json)
+          AND json_valid(coalesce(nullif(context_json, ''), '{}'))
         ORDER BY created_at DESC
     """)
 
-    all_examples = []
+    examples_yielded = 0
     decisions_processed = 0
 
-    for row in cursor:
-        try:
-            context_json = json.loads(row['context_json']) if row['context_json'] else {}
-            counsel_json = json.loads(row['counsel_json']) if row['counsel_json'] else {}
-
-            examples = decision_to_examples(
-                decision_id=row['id'],
-                question=row['question'],
-                context_json=context_json,
-                counsel_json=counsel_json,
-                outcome_success=bool(row['outcome_success']),
-                outcome_notes=row['outcome_notes'] or '',
-            )
-
-            all_examples.extend(examples)
+    if workers <= 1:
+        for row in cursor:
+            examples = row_to_examples(row)
             decisions_processed += 1
+            examples_yielded += len(examples)
+            yield from examples
+    else:
+        # Rows are plain tuples, so batches pickle cheaply. Keep a bounded
+        # window of batches in flight so the cursor is still consumed lazily.
+        batches = iter(lambda: cursor.fetchmany(batch_size), [])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque(pool.submit(rows_to_examples, rows)
+                            for rows in islice(batches, workers * 2))
+            while pending:
+                row_count, examples = pending.popleft().result()
+                rows = next(batches, None)
+                if rows is not None:
+                    pending.append(pool.submit(rows_to_examples, rows))
+                decisions_processed += row_count
+                examples_yielded += len(examples)
+                yield from examples
 
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Warning: Skipping decision {row['id']}: {e}", file=sys.stderr)
-            continue
+    print(f"Extracted {examples_yielded} examples from {decisions_processed} decisions")
 
-    conn.close()
 
-    print(f"Extracted {len(all_examples)} examples from {decisions_processed} decisions")
-    return all_examples
+_EXHAUSTED = object()
 
 
-def load_synthetic_data(path: str) -> List[dict]:
-    """Load synthetic training data from JSONL file."""
-    examples = []
-    with open(path, 'r') as f:
-        for line in f:
-            examples.append(json.loads(line.strip()))
-    return examples
+def sample_jsonl_lines(path: str, k: int) -> List[bytes]:
+    """
+    Uniformly sample up to k non-blank raw lines from a JSONL file.
+
+    The file is memory-mapped and indexed by line start offsets, so only the
+    sampled lines are ever copied out (and later parsed); memory is
+    O(lines * 8 bytes + k) rather than O(file).
+    """
+    with open(path, 'rb') as f:
+        if k <= 0 or os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            size = len(mm)
+
+            starts = array('Q')
+            start = 0
+            end = find(b'\n')
+            while end != -1:
+                if end - start > 2 or mm[start:end].strip():
+                    starts.append(start)
+                start = end + 1
+                end = find(b'\n', start)
+            if mm[start:size].strip():
+                starts.append(start)
+
+            lines = []
+            for i in sorted(random.sample(range(len(starts)), min(k, len(starts)))):
+                s = starts[i]
+                e = find(b'\n', s)
+                lines.append(mm[s:e if e != -1 else size])
+            return lines
+
+
+def reservoir_sample(items: Iterable, k: int) -> list:
+    """
+    Uniformly sample up to k items in a single pass.
+
+    Uses Li's Algorithm L: after the reservoir fills, it jumps ahead by
+    geometrically distributed gaps, so it needs O(k log(n/k)) random draws
+    instead of one per item.
+    """
+    if k <= 0:
+        return []
+
+    it = iter(items)
+    reservoir = list(islice(it, k))
+    if len(reservoir) < k:
+        return reservoir
+
+    w = math.exp(math.log(random.random()) / k)
+    while True:
+        skip = math.floor(math.log(random.random()) / math.log(1.0 - w))
+        item = next(islice(it, skip, None), _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return reservoir
+        reservoir[random.randrange(k)] = item
+        w *= math.exp(math.log(random.random()) / k)
+
+
+def write_jsonl(examples: Iterable[dict], fh: BinaryIO) -> Tuple[int, int]:
+    """Write examples to a JSONL handle opened in binary mode. Returns (written, success_count)."""
+    written = 0
+    success_count = 0
+
+    for example in examples:
+        fh.write(dump_jsonl_line(example))
+        written += 1
+        if example['success'] > 0.5:
+            success_count += 1
 
+    return written, success_count
 
-def create_hybrid_dataset(
-    real_examples: List[TrainingExample],
+
+def stream_hybrid(
+    real_iter: Iterable[TrainingExample],
     synthetic_path: str,
     real_ratio: float,
-    total_size: int = 10000,
-) -> List[dict]:
+    total_size: int,
+    fh: BinaryIO,
+) -> Tuple[int, int]:
     """
-    Create hybrid dataset mixing real and synthetic data.
+    Stream a hybrid dataset mixing real and synthetic data into fh.
+
+    Real examples are reservoir-sampled in a single pass and synthetic lines
+    are sampled through a line-offset index, so only the sampled examples are
+    ever parsed or held in memory.
 
     Args:
-        real_examples: Extracted real outcome examples
+        real_iter: Stream of extracted real outcome examples
         synthetic_path: Path to synthetic JSONL
         real_ratio: Ratio of real data (0.0-1.0)
         total_size: Target total dataset size
+        fh: Output file handle opened in binary mode
 
     Returns:
-        Mixed dataset as list of dicts
+        (written, success_count)
     """
-    synthetic_data = load_synthetic_data(synthetic_path)
-
     # Calculate counts
     target_real = int(total_size * real_ratio)
-    target_synthetic = total_size - target_real
 
     # Handle cold-start: if not enough real data, adjust ratio
-    actual_real = min(target_real, len(real_examples))
+    sampled_real = reservoir_sample(real_iter, target_real)
+    actual_real = len(sampled_real)
     actual_synthetic = total_size - actual_real
 
     if actual_real < target_real:
-        print(f"Warning: Only {len(real_examples)} real examples available, "
+        print(f"Warning: Only {actual_real} real examples available, "
               f"using {actual_real} (requested {target_real})")
 
-    # Sample data
-    if actual_real > 0:
-        if len(real_examples) <= actual_real:
-            sampled_real = [e.to_dict() for e in real_examples]
-        else:
-            sampled_real = [e.to_dict() for e in random.sample(real_examples, actual_real)]
-    else:
-        sampled_real = []
-
-    sampled_synthetic = random.sample(synthetic_data, min(actual_synthetic, len(synthetic_data)))
+    sampled_synthetic = sample_jsonl_lines(synthetic_path, actual_synthetic)
 
     # Combine and shuffle
-    combined = sampled_real + sampled_synthetic
+    combined = [e.to_dict() for e in sampled_real]
+    combined.extend(json_loads(line) for line in sampled_synthetic)
     random.shuffle(combined)
 
-    print(f"Hybrid dataset: {len(sampled_real)} real + {len(sampled_synthetic)} synthetic = {len(combined)} total")
-    return combined
+    print(f"Hybrid dataset: {actual_real} real + {len(sampled_synthetic)} synthetic = {len(combined)} total")
+    return write_jsonl(combined, fh)
 
 
 def check_outcome_availability(db_path: str) -> dict:
@@ -432,33 +695,30 @@ def check_outcome_availability(db_path: str) -> dict:
 
     stats['schema_initialized'] = True
 
-    # Total decisions
-    stats['total_decisions'] = conn.execute(
-        "SELECT COUNT(*) FROM decisions"
-    ).fetchone()[0]
-
-    # With outcomes
-    stats['with_outcomes'] = conn.execute(
-        "SELECT COUNT(*) FROM decisions WHERE outcome_success IS NOT NULL"
-    ).fetchone()[0]
+    # Totals, outcomes, successes and recent (last 30 days) outcomes in one scan
+    (
+        stats['total_decisions'],
+        stats['with_outcomes'],
+        stats['success_count'],
+        stats['recent_outcomes'],
+    ) = conn.execute("""
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(outcome_success IS NOT NULL), 0),
+            COALESCE(SUM(outcome_success = 1), 0),
+            COALESCE(SUM(
+                outcome_success IS NOT NULL
+                AND outcome_recorded_at >= datetime('now', '-30 days')
+            ), 0)
+        FROM decisions
+    """).fetchone()
 
     # Success rate
     if stats['with_outcomes'] > 0:
-        stats['success_count'] = conn.execute(
-            "SELECT COUNT(*) FROM decisions WHERE outcome_success = 1"
-        ).fetchone()[0]
         stats['success_rate'] = stats['success_count'] / stats['with_outcomes']
     else:
-        stats['success_count'] = 0
         stats['success_rate'] = None
 
-    # Recent outcomes (last 30 days)
-    stats['recent_outcomes'] = conn.execute("""
-        SELECT COUNT(*) FROM decisions
-        WHERE outcome_success IS NOT NULL
-        AND outcome_recorded_at >= datetime('now', '-30 days')
-    """).fetchone()[0]
-
     conn.close()
     return stats
 
@@ -495,6 +755,10 @@ def main():
         '--seed', type=int, default=42,
         help='Random seed for reproducibility'
     )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Worker processes for feature extraction (default: all cores)'
+    )
 
     args = parser.parse_args()
     random.seed(args.seed)
@@ -533,39 +797,36 @@ def main():
         print("Error: --output required", file=sys.stderr)
         sys.exit(1)
 
-    # Extract real outcomes
-    real_examples = extract_from_database(args.db)
-
-    # Hybrid or pure real mode
-    if args.synthetic:
-        if not Path(args.synthetic).exists():
-            print(f"Error: Synthetic data not found: {args.synthetic}", file=sys.stderr)
-            sys.exit(1)
-
-        dataset = create_hybrid_dataset(
-            real_examples,
-            args.synthetic,
-            args.ratio,
-            args.total,
-        )
-    else:
-        dataset = [e.to_dict() for e in real_examples]
+    # Hybrid mode requires the synthetic pool up front
+    if args.synthetic and not Path(args.synthetic).exists():
+        print(f"Error: Synthetic data not found: {args.synthetic}", file=sys.stderr)
+        sys.exit(1)
 
-    # Write output
+    # Stream examples straight into the output file
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        for example in dataset:
-            f.write(json.dumps(example) + '\n')
+    conn = sqlite3.connect(args.db)
+    with open(output_path, 'wb') as f:
+        real_examples = iter_examples(conn, workers=args.workers)
+
+        if args.synthetic:
+            written, success_count = stream_hybrid(
+                real_examples,
+                args.synthetic,
+                args.ratio,
+                args.total,
+                f,
+            )
+        else:
+            written, success_count = write_jsonl((e.to_dict() for e in real_examples), f)
+    conn.close()
 
-    print(f"Wrote {len(dataset)} examples to {args.output}")
+    print(f"Wrote {written} examples to {args.output}")
 
     # Summary statistics
-    if dataset:
-        success_count = sum(1 for e in dataset if e['success'] > 0.5)
-        print(f"Success rate: {success_count/len(dataset):.1%}")
-
+    if written:
+        print(f"Success rate: {success_count/written:.1%}")
 
 if __name__ == '__main__':
     main()
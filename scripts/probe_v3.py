@@ -14,46 +14,21 @@ Usage:
 import json
 import math
 
-# V3 Configuration - calibrated to avoid ceiling saturation
-# Lower base rate allows bonuses/penalties to create meaningful spread
-V3_CONFIG = {
-    'base_success_rate': 0.35,      # Lowered from 0.45
-    'domain_match_bonus': 0.15,     # Reduced from 0.25
-    'relevance_bonus': 0.20,        # V3: for exponential decay
-    'confidence_weight': 0.20,      # Reduced from 0.3
-    'thinker_expertise_bonus': 0.15,
-    'disagreement_penalty': 0.10,
-    'difficulty_penalty': 0.08,
-    # V3 additions - these are the key causal fixes
-    'cross_domain_expert_penalty': 0.40,  # STRONG penalty for wrong-domain expert
-    'rank_decay_base': 0.5,               # Exponential: rank n gets bonus * 0.5^n
-    'causal_adversarial_rate': 0.15,      # 15% of domain mismatches forced to fail
-}
-
-# Thinker expertise mapping
-THINKER_DOMAINS = {
-    'kent-beck': ['testing'],
-    'martin-fowler': ['architecture'],
-    'sam-newman': ['architecture'],
-    'fred-brooks': ['management'],
-    'brendan-gregg': ['performance', 'scaling'],
-    'bruce-schneier': ['security'],
-    'werner-vogels': ['scaling'],
-    'donald-knuth': ['performance'],
-}
-
-def get_expert_domains(thinker: str) -> list:
-    """Get domains a thinker is expert in."""
-    thinker_lower = thinker.lower().replace(' ', '-')
-    for key, domains in THINKER_DOMAINS.items():
-        if key in thinker_lower:
-            return domains
-    return []
-
-def is_cross_domain_expert(thinker: str, question_domain: str) -> bool:
-    """Check if thinker is expert but in wrong domain."""
-    expert_domains = get_expert_domains(thinker)
-    return len(expert_domains) > 0 and question_domain not in expert_domains
+from _probe_core import (
+    V3_CONFIG,
+    _BASE_RATE,
+    _CONFIDENCE_WEIGHT,
+    _CROSS_DOMAIN_PENALTY,
+    _DIFFICULTY_PENALTY,
+    _DISAGREEMENT_PENALTY,
+    _DOMAIN_MATCH_BONUS,
+    _EXPERTISE_BONUS,
+    _RANK_DECAY_BASE,
+    _RELEVANCE_BONUS,
+    get_expert_domains,
+    is_cross_domain_expert,
+)
+
 
 def calculate_v3_success_prob(
     thinker: str,
@@ -63,61 +38,70 @@ def calculate_v3_success_prob(
     is_pattern_match: bool = True,
     is_for_position: bool = True,
     difficulty: int = 3,
+    return_breakdown: bool = False,
 ) -> dict:
-    """Calculate V3 success probability with full breakdown."""
-    cfg = V3_CONFIG
-    prob = cfg['base_success_rate']
-    breakdown = {'base': prob}
+    """Calculate V3 success probability, with the per-term breakdown if requested."""
+    prob = _BASE_RATE
+    breakdown = {'base': prob} if return_breakdown else None
 
     # 1. Pattern match bonus
     if is_pattern_match:
-        bonus = cfg['domain_match_bonus']
+        bonus = _DOMAIN_MATCH_BONUS
         prob += bonus
-        breakdown['pattern_match'] = bonus
+        if return_breakdown:
+            breakdown['pattern_match'] = bonus
 
     # 2. Confidence bonus
-    conf_bonus = confidence * cfg['confidence_weight']
+    conf_bonus = confidence * _CONFIDENCE_WEIGHT
     prob += conf_bonus
-    breakdown['confidence'] = conf_bonus
+    if return_breakdown:
+        breakdown['confidence'] = conf_bonus
 
     # 3. V3: EXPONENTIAL rank decay
-    rank_bonus = cfg['relevance_bonus'] * (cfg['rank_decay_base'] ** rank)
+    rank_bonus = _RELEVANCE_BONUS * (_RANK_DECAY_BASE ** rank)
     prob += rank_bonus
-    breakdown['rank_bonus'] = rank_bonus
+    if return_breakdown:
+        breakdown['rank_bonus'] = rank_bonus
 
     # 4. Domain alignment
     domain_aligned = is_for_position  # Simplified
     if domain_aligned:
-        bonus = cfg['domain_match_bonus'] * 0.5
+        bonus = _DOMAIN_MATCH_BONUS * 0.5
         prob += bonus
-        breakdown['domain_aligned'] = bonus
+        if return_breakdown:
+            breakdown['domain_aligned'] = bonus
     else:
-        penalty = cfg['disagreement_penalty']
+        penalty = _DISAGREEMENT_PENALTY
         prob -= penalty
-        breakdown['disagreement'] = -penalty
+        if return_breakdown:
+            breakdown['disagreement'] = -penalty
 
     # 5. Thinker expertise bonus
     expert_domains = get_expert_domains(thinker)
     is_expert_match = question_domain in expert_domains
     if is_expert_match:
-        prob += cfg['thinker_expertise_bonus']
-        breakdown['expert_bonus'] = cfg['thinker_expertise_bonus']
+        prob += _EXPERTISE_BONUS
+        if return_breakdown:
+            breakdown['expert_bonus'] = _EXPERTISE_BONUS
 
     # 6. V3: Cross-domain expert PENALTY
     is_wrong_domain = is_cross_domain_expert(thinker, question_domain)
     if is_wrong_domain:
-        penalty = cfg['cross_domain_expert_penalty']
+        penalty = _CROSS_DOMAIN_PENALTY
         prob -= penalty
-        breakdown['cross_domain_penalty'] = -penalty
+        if return_breakdown:
+            breakdown['cross_domain_penalty'] = -penalty
 
     # 7. Difficulty penalty
-    diff_penalty = (difficulty - 2.5) * cfg['difficulty_penalty']
+    diff_penalty = (difficulty - 2.5) * _DIFFICULTY_PENALTY
     prob -= diff_penalty
-    breakdown['difficulty'] = -diff_penalty
+    if return_breakdown:
+        breakdown['difficulty'] = -diff_penalty
 
     # Clamp
     prob = max(0.05, min(0.95, prob))
-    breakdown['final'] = prob
+    if return_breakdown:
+        breakdown['final'] = prob
 
     return {
         'success_prob': prob,
@@ -187,13 +171,13 @@ def probe_rank_sensitivity():
             question_domain="architecture",
             rank=rank,
             confidence=0.7,
+            return_breakdown=True,
         )
         results.append((rank, result['success_prob'], result['breakdown']['rank_bonus']))
 
-    print("  Rank | P(success) | Rank Bonus")
-    print("  -----|------------|----------")
-    for rank, prob, bonus in results:
-        print(f"    {rank}  |   {prob:.1%}    |   {bonus:.3f}")
+    lines = ["  Rank | P(success) | Rank Bonus", "  -----|------------|----------"]
+    lines.extend(f"    {rank}  |   {prob:.1%}    |   {bonus:.3f}" for rank, prob, bonus in results)
+    print("\n".join(lines))
 
     spread = results[0][1] - results[4][1]
     print(f"\n  Spread (rank 0 → 4): {spread*100:.1f}pp")
@@ -247,9 +231,7 @@ def main():
     print("="*60)
     passed = sum(1 for _, p in results if p)
     total = len(results)
-    for name, p in results:
-        status = "✅ PASS" if p else "❌ FAIL"
-        print(f"  {status}: {name}")
+    print("\n".join(f"  {'✅ PASS' if p else '❌ FAIL'}: {name}" for name, p in results))
 
     print(f"\n  Total: {passed}/{total} tests passed")
 
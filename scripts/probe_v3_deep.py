@@ -11,172 +11,153 @@ Usage:
     python scripts/probe_v3_deep.py
 """
 
-import json
-import math
-import random
-from dataclasses import dataclass
-from typing import List, Dict, Tuple
-
-# V3 Configuration
-V3_CONFIG = {
-    'base_success_rate': 0.35,
-    'domain_match_bonus': 0.15,
-    'relevance_bonus': 0.20,
-    'confidence_weight': 0.20,
-    'thinker_expertise_bonus': 0.15,
-    'disagreement_penalty': 0.10,
-    'difficulty_penalty': 0.08,
-    'cross_domain_expert_penalty': 0.40,
-    'rank_decay_base': 0.5,
-    'causal_adversarial_rate': 0.15,
-}
-
-# Thinker expertise mapping (expanded)
-THINKER_DOMAINS = {
-    'kent-beck': ['testing'],
-    'martin-fowler': ['architecture'],
-    'sam-newman': ['architecture'],
-    'fred-brooks': ['management'],
-    'brendan-gregg': ['performance', 'scaling'],
-    'bruce-schneier': ['security'],
-    'werner-vogels': ['scaling'],
-    'donald-knuth': ['performance'],
-    'michael-feathers': ['testing', 'architecture'],
-    'camille-fournier': ['management'],
-    'eric-evans': ['architecture'],
-}
-
-DOMAINS = ['architecture', 'testing', 'scaling', 'management', 'security', 'performance', 'database', 'devops']
-
-
-@dataclass
-class SimulatedExample:
-    thinker: str
-    question_domain: str
-    rank: int
-    confidence: float
-    true_success: float  # Ground truth
-    predicted_prob: float  # Model prediction
-
-
-def get_expert_domains(thinker: str) -> List[str]:
-    """Get domains a thinker is expert in."""
-    thinker_lower = thinker.lower().replace(' ', '-')
-    for key, domains in THINKER_DOMAINS.items():
-        if key in thinker_lower:
-            return domains
-    return []
-
-
-def is_cross_domain_expert(thinker: str, question_domain: str) -> bool:
-    """Check if thinker is expert but in wrong domain."""
-    expert_domains = get_expert_domains(thinker)
-    return len(expert_domains) > 0 and question_domain not in expert_domains
-
-
-def calculate_v3_prob(thinker: str, domain: str, rank: int, confidence: float = 0.7) -> float:
-    """Calculate V3 predicted probability."""
-    cfg = V3_CONFIG
-    prob = cfg['base_success_rate']
-
-    # Pattern match (simplified: assume 50% match)
-    prob += cfg['domain_match_bonus'] * 0.5
-
-    # Confidence
-    prob += confidence * cfg['confidence_weight']
-
-    # Exponential rank decay
-    prob += cfg['relevance_bonus'] * (cfg['rank_decay_base'] ** rank)
-
-    # Domain alignment (simplified)
-    prob += cfg['domain_match_bonus'] * 0.5
-
-    # Expert bonus/penalty
-    expert_domains = get_expert_domains(thinker)
-    if domain in expert_domains:
-        prob += cfg['thinker_expertise_bonus']
-    elif len(expert_domains) > 0:
-        prob -= cfg['cross_domain_expert_penalty']
-
-    return max(0.05, min(0.95, prob))
-
-
-def generate_adversarial_examples(n: int, adversarial_rate: float = 0.20) -> List[SimulatedExample]:
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, Tuple
+
+import numpy as np
+
+from _probe_core import (
+    DOMAINS,
+    EXPERT_MASK,
+    HAS_EXPERT,
+    HAS_WRONG_DOMAIN,
+    STATE_CROSS,
+    STATE_MATCH,
+    STATE_NEUTRAL,
+    STATE_TABLE,
+    THINKER_KEYS,
+    calculate_v3_probs,
+)
+
+# One simulated example per row: thinker/domain are indices into
+# THINKER_KEYS/DOMAINS, state is their STATE_TABLE entry, true is the
+# ground-truth label, pred the V3 prediction
+_EXAMPLE_DTYPE = np.dtype([
+    ('thinker', np.int16),
+    ('domain', np.int8),
+    ('state', np.int8),
+    ('rank', np.int8),
+    ('conf', np.float32),
+    ('true', np.float32),
+    ('pred', np.float32),
+])
+
+# WRONG_DOMAINS[t, :WRONG_DOMAIN_COUNT[t]]: indices of the domains thinker t
+# is NOT expert in (rows padded with zeros)
+WRONG_DOMAIN_COUNT = (~EXPERT_MASK).sum(axis=1)
+WRONG_DOMAINS = np.zeros(EXPERT_MASK.shape, dtype=np.int8)
+for _t, _wrong in enumerate(~EXPERT_MASK):
+    WRONG_DOMAINS[_t, :WRONG_DOMAIN_COUNT[_t]] = np.flatnonzero(_wrong)
+
+
+def simulate_examples(
+    thinker: np.ndarray,
+    domain: np.ndarray,
+    success_rates: Tuple[float, float, float],
+    rng: np.random.Generator,
+    forced_failure: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Label and score examples for the given thinker/domain index arrays.
+
+    Args:
+        thinker: Indices into THINKER_KEYS
+        domain: Indices into DOMAINS
+        success_rates: Ground-truth success rate for (expert match, cross-domain, neutral)
+        rng: Random generator for labels, ranks and confidences
+        forced_failure: Optional mask of rows whose label is forced to failure
+
+    Returns:
+        _EXAMPLE_DTYPE array
+    """
+    n = len(thinker)
+    match_rate, cross_rate, neutral_rate = success_rates
+
+    # One table gather gives each row's expert state; rates are looked up by state
+    states = STATE_TABLE[thinker, domain]
+    expert_match = states == STATE_MATCH
+    cross_domain = states == STATE_CROSS
+    rate_by_state = np.empty(3)
+    rate_by_state[[STATE_NEUTRAL, STATE_MATCH, STATE_CROSS]] = neutral_rate, match_rate, cross_rate
+    true_success = rng.random(n) < rate_by_state[states]
+    if forced_failure is not None:
+        true_success &= ~forced_failure
+
+    rank = rng.integers(0, 5, n)
+    confidence = rng.uniform(0.5, 0.9, n)
+
+    examples = np.empty(n, dtype=_EXAMPLE_DTYPE)
+    examples['thinker'] = thinker
+    examples['domain'] = domain
+    examples['state'] = states
+    examples['rank'] = rank
+    examples['conf'] = confidence
+    examples['true'] = true_success
+    calculate_v3_probs(expert_match, cross_domain, rank, confidence, out=examples['pred'])
+    return examples
+
+
+def generate_adversarial_examples(
+    n: int,
+    adversarial_rate: float = 0.20,
+    rng: np.random.Generator = None,
+) -> np.ndarray:
     """Generate examples with adversarial domain mismatches."""
-    examples = []
-    thinkers = list(THINKER_DOMAINS.keys())
-
-    for _ in range(n):
-        thinker = random.choice(thinkers)
-        expert_domains = THINKER_DOMAINS.get(thinker, [])
-
-        # 20% adversarial: wrong domain for expert
-        if random.random() < adversarial_rate and expert_domains:
-            # Pick domain they're NOT expert in
-            wrong_domains = [d for d in DOMAINS if d not in expert_domains]
-            domain = random.choice(wrong_domains) if wrong_domains else random.choice(DOMAINS)
-            true_success = 0.0  # Adversarial: wrong domain = failure
-        else:
-            # Normal: random domain
-            domain = random.choice(DOMAINS)
-            # Ground truth: expert match = 80% success, mismatch = 40%
-            if domain in expert_domains:
-                true_success = 1.0 if random.random() < 0.80 else 0.0
-            elif expert_domains:
-                true_success = 1.0 if random.random() < 0.30 else 0.0  # Cross-domain penalty
-            else:
-                true_success = 1.0 if random.random() < 0.50 else 0.0
-
-        rank = random.randint(0, 4)
-        confidence = random.uniform(0.5, 0.9)
-        predicted = calculate_v3_prob(thinker, domain, rank, confidence)
-
-        examples.append(SimulatedExample(
-            thinker=thinker,
-            question_domain=domain,
-            rank=rank,
-            confidence=confidence,
-            true_success=true_success,
-            predicted_prob=predicted,
-        ))
+    if rng is None:
+        rng = np.random.default_rng()
 
-    return examples
+    thinker = rng.integers(0, len(THINKER_KEYS), n)
+    has_expert = HAS_EXPERT[thinker]
+    has_wrong = HAS_WRONG_DOMAIN[thinker]
+
+    # 20% adversarial: wrong domain for expert (only experts draw a coin)
+    adversarial = np.zeros(n, dtype=bool)
+    adversarial[has_expert] = rng.random(int(has_expert.sum())) < adversarial_rate
+    domain = rng.integers(0, len(DOMAINS), n)
+
+    # Pick domain they're NOT expert in: one gather from the thinker's wrong domains
+    pick = adversarial & has_wrong
+    picked = thinker[pick]
+    domain[pick] = WRONG_DOMAINS[picked, rng.integers(0, WRONG_DOMAIN_COUNT[picked])]
+
+    # Ground truth: expert match = 80% success, cross-domain = 30%, neutral = 50%;
+    # adversarial: wrong domain = failure
+    return simulate_examples(thinker, domain, (0.80, 0.30, 0.50), rng, forced_failure=adversarial)
 
 
-def calculate_metrics(examples: List[SimulatedExample], threshold: float = 0.5) -> Dict:
-    """Calculate accuracy and calibration metrics."""
-    correct = 0
+def calculate_metrics(examples: np.ndarray, threshold: float = 0.5) -> Dict:
+    """Calculate accuracy and calibration metrics over an _EXAMPLE_DTYPE array."""
     total = len(examples)
+    if total == 0:
+        return {
+            'accuracy': 0, 'brier_score': 0, 'expert_match_acc': 0,
+            'cross_domain_acc': 0, 'expert_match_n': 0, 'cross_domain_n': 0,
+        }
+
+    predicted = examples['pred']
+    true_success = examples['true']
+    predicted_class = (predicted >= threshold).astype(np.float32)
+    correct = predicted_class == true_success
 
     # Brier score (calibration)
-    brier_sum = 0.0
-
-    # By category
-    expert_match_correct = 0
-    expert_match_total = 0
-    cross_domain_correct = 0
-    cross_domain_total = 0
-
-    for ex in examples:
-        predicted_class = 1.0 if ex.predicted_prob >= threshold else 0.0
-        if predicted_class == ex.true_success:
-            correct += 1
-
-        brier_sum += (ex.predicted_prob - ex.true_success) ** 2
-
-        expert_domains = get_expert_domains(ex.thinker)
-        if ex.question_domain in expert_domains:
-            expert_match_total += 1
-            if predicted_class == ex.true_success:
-                expert_match_correct += 1
-        elif expert_domains:
-            cross_domain_total += 1
-            if predicted_class == ex.true_success:
-                cross_domain_correct += 1
+    brier_sum = float(((predicted - true_success) ** 2).sum(dtype=np.float64))
+
+    # By category: one bincount each for totals and correct predictions
+    states = examples['state']
+    totals = np.bincount(states, minlength=3)
+    corrects = np.bincount(states, weights=correct, minlength=3)
+
+    expert_match_total = int(totals[STATE_MATCH])
+    cross_domain_total = int(totals[STATE_CROSS])
+    expert_match_correct = int(corrects[STATE_MATCH])
+    cross_domain_correct = int(corrects[STATE_CROSS])
 
     return {
-        'accuracy': correct / total if total > 0 else 0,
-        'brier_score': brier_sum / total if total > 0 else 0,
+        'accuracy': int(correct.sum()) / total,
+        'brier_score': brier_sum / total,
         'expert_match_acc': expert_match_correct / expert_match_total if expert_match_total > 0 else 0,
         'cross_domain_acc': cross_domain_correct / cross_domain_total if cross_domain_total > 0 else 0,
         'expert_match_n': expert_match_total,
@@ -190,8 +171,8 @@ def probe_adversarial_robustness():
     print("PROBE 1: Adversarial Robustness (20% attack rate)")
     print("="*60)
 
-    random.seed(42)
-    examples = generate_adversarial_examples(5000, adversarial_rate=0.20)
+    rng = np.random.default_rng(42)
+    examples = generate_adversarial_examples(5000, adversarial_rate=0.20, rng=rng)
     metrics = calculate_metrics(examples)
 
     print(f"\n  Overall Accuracy:     {metrics['accuracy']:.1%}")
@@ -214,56 +195,34 @@ def probe_multi_agent_drift():
     print("="*60)
 
     # Simulate 3 agents with slightly different data distributions
-    random.seed(42)
+    rng = np.random.default_rng(42)
+    n = 1000
 
     agent_metrics = []
     for agent_id in range(3):
         # Each agent sees slightly different domain distribution
-        domain_bias = DOMAINS[agent_id % len(DOMAINS)]
-
-        examples = []
-        for _ in range(1000):
-            thinker = random.choice(list(THINKER_DOMAINS.keys()))
-            # 60% of examples from biased domain
-            if random.random() < 0.6:
-                domain = domain_bias
-            else:
-                domain = random.choice(DOMAINS)
-
-            expert_domains = get_expert_domains(thinker)
-            if domain in expert_domains:
-                true_success = 1.0 if random.random() < 0.80 else 0.0
-            elif expert_domains:
-                true_success = 1.0 if random.random() < 0.30 else 0.0
-            else:
-                true_success = 1.0 if random.random() < 0.50 else 0.0
-
-            rank = random.randint(0, 4)
-            confidence = random.uniform(0.5, 0.9)
-            predicted = calculate_v3_prob(thinker, domain, rank, confidence)
-
-            examples.append(SimulatedExample(
-                thinker=thinker,
-                question_domain=domain,
-                rank=rank,
-                confidence=confidence,
-                true_success=true_success,
-                predicted_prob=predicted,
-            ))
+        bias_idx = agent_id % len(DOMAINS)
+        domain_bias = DOMAINS[bias_idx]
+
+        thinker = rng.integers(0, len(THINKER_KEYS), n)
+        # 60% of examples from biased domain
+        domain = np.where(rng.random(n) < 0.6, bias_idx, rng.integers(0, len(DOMAINS), n))
 
+        examples = simulate_examples(thinker, domain, (0.80, 0.30, 0.50), rng)
         metrics = calculate_metrics(examples)
         agent_metrics.append((agent_id, domain_bias, metrics))
 
-    print("\n  Agent | Bias Domain  | Accuracy | Brier")
-    print("  ------|--------------|----------|------")
-    for agent_id, bias, m in agent_metrics:
-        print(f"    {agent_id}   | {bias:12} | {m['accuracy']:.1%}    | {m['brier_score']:.3f}")
+    lines = ["\n  Agent | Bias Domain  | Accuracy | Brier", "  ------|--------------|----------|------"]
+    lines.extend(
+        f"    {agent_id}   | {bias:12} | {m['accuracy']:.1%}    | {m['brier_score']:.3f}"
+        for agent_id, bias, m in agent_metrics
+    )
+    print("\n".join(lines))
 
     # Calculate variance (drift indicator)
-    accs = [m['accuracy'] for _, _, m in agent_metrics]
-    mean_acc = sum(accs) / len(accs)
-    variance = sum((a - mean_acc)**2 for a in accs) / len(accs)
-    drift_magnitude = math.sqrt(variance) * 100  # Convert to percentage points
+    accs = np.fromiter((m['accuracy'] for _, _, m in agent_metrics), dtype=np.float64)
+    mean_acc = float(accs.mean())
+    drift_magnitude = float(accs.std()) * 100  # Population std, in percentage points
 
     print(f"\n  Mean Accuracy:  {mean_acc:.1%}")
     print(f"  Drift (std):    {drift_magnitude:.1f}pp")
@@ -292,39 +251,20 @@ def probe_cold_start_fragility():
     print("="*60)
 
     # Simulate what happens when real data differs from synthetic heuristics
-    random.seed(42)
+    rng = np.random.default_rng(42)
 
     # Synthetic: Our heuristics
-    synthetic_examples = generate_adversarial_examples(2500, adversarial_rate=0.15)
+    synthetic_examples = generate_adversarial_examples(2500, adversarial_rate=0.15, rng=rng)
     synthetic_metrics = calculate_metrics(synthetic_examples)
 
     # "Real" with distribution shift: Different success rates
-    real_examples = []
-    for _ in range(500):
-        thinker = random.choice(list(THINKER_DOMAINS.keys()))
-        domain = random.choice(DOMAINS)
-        expert_domains = get_expert_domains(thinker)
-
-        # Real data has noisier success rates (harder to predict)
-        if domain in expert_domains:
-            true_success = 1.0 if random.random() < 0.65 else 0.0  # Lower than synthetic 80%
-        elif expert_domains:
-            true_success = 1.0 if random.random() < 0.45 else 0.0  # Higher than synthetic 30%
-        else:
-            true_success = 1.0 if random.random() < 0.55 else 0.0
-
-        rank = random.randint(0, 4)
-        confidence = random.uniform(0.5, 0.9)
-        predicted = calculate_v3_prob(thinker, domain, rank, confidence)
-
-        real_examples.append(SimulatedExample(
-            thinker=thinker,
-            question_domain=domain,
-            rank=rank,
-            confidence=confidence,
-            true_success=true_success,
-            predicted_prob=predicted,
-        ))
+    n = 500
+    thinker = rng.integers(0, len(THINKER_KEYS), n)
+    domain = rng.integers(0, len(DOMAINS), n)
+
+    # Real data has noisier success rates (harder to predict): expert match
+    # lower than synthetic 80%, cross-domain higher than synthetic 30%
+    real_examples = simulate_examples(thinker, domain, (0.65, 0.45, 0.55), rng)
 
     real_metrics = calculate_metrics(real_examples)
 
@@ -351,6 +291,14 @@ def probe_cold_start_fragility():
         return False, {'synth_acc': synthetic_metrics['accuracy'], 'real_acc': real_metrics['accuracy'], 'drop': drop}
 
 
+def _run_probe(test_fn):
+    """Run one probe in a worker, returning its result and captured output."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        result = test_fn()
+    return result, buf.getvalue()
+
+
 def main():
     print("\n" + "╔" + "═"*58 + "╗")
     print("║  🔬 V3 DEEP PROBE: Multi-Agent & Adversarial            ║")
@@ -363,12 +311,17 @@ def main():
         ("Cold-Start Fragility", probe_cold_start_fragility),
     ]
 
+    # The probes share no state, so run them side by side and replay each
+    # one's output in order once it finishes
     results = []
     all_metrics = {}
-    for name, test_fn in tests:
-        passed, metrics = test_fn()
-        results.append((name, passed))
-        all_metrics[name] = metrics
+    with ProcessPoolExecutor(max_workers=len(tests)) as pool:
+        futures = [pool.submit(_run_probe, test_fn) for _, test_fn in tests]
+        for (name, _), future in zip(tests, futures):
+            (passed, metrics), output = future.result()
+            sys.stdout.write(output)
+            results.append((name, passed))
+            all_metrics[name] = metrics
 
     print("\n" + "="*60)
     print("DEEP PROBE SUMMARY")
@@ -376,9 +329,7 @@ def main():
 
     passed = sum(1 for _, p in results if p)
     total = len(results)
-    for name, p in results:
-        status = "✅ PASS" if p else "⚠️  WARN"
-        print(f"  {status}: {name}")
+    print("\n".join(f"  {'✅ PASS' if p else '⚠️  WARN'}: {name}" for name, p in results))
 
     print(f"\n  Tests: {passed}/{total} passed")
 
@@ -419,5 +370,4 @@ def main():
 
 
 if __name__ == '__main__':
-    import sys
     sys.exit(0 if main() else 1)
@@ -13,11 +13,23 @@ Usage:
     python scripts/probe_v4_swarm.py
 """
 
-import math
-import random
-from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
-from collections import defaultdict
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import compress
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Numba is optional: without it the simulation steps through NumPy array ops
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Constants
 DOMAINS = ['architecture', 'testing', 'scaling', 'management', 'security', 'performance']
@@ -31,138 +43,310 @@ PRINCIPLES = [
     ('defense-in-depth', 'security'),
     ('measure-first', 'performance'),
 ]
+# "principle:domain" name of each principle index; posteriors are indexed by
+# position in PRINCIPLES, so these strings are only built for reporting
+PRINCIPLE_KEYS = [f"{principle}:{domain}" for principle, domain in PRINCIPLES]
+
+# Ground truth success rate of each principle, aligned with PRINCIPLES
+GROUND_TRUTH = np.array([0.75, 0.70, 0.80, 0.65, 0.60, 0.85, 0.70, 0.75], dtype=np.float32)
+
+SYNC_INTERVAL = 10
+FORGETTING_FACTOR = 0.95
+DECAY_INTERVAL = 10  # outcomes between forgetting-factor passes
+_MAX_EVIDENCE_SCALE = 1e12
+
+# Wire format of one posterior delta, laid out like struct "<BIfff"
+# (17 bytes): sender agent, principle index, alpha/beta increment, confidence
+DELTA_DTYPE = np.dtype([
+    ('sender', 'u1'),
+    ('principle', '<u4'),
+    ('alpha_delta', '<f4'),
+    ('beta_delta', '<f4'),
+    ('confidence', '<f4'),
+])
+# 'sender' is one byte: more agents would wrap and misattribute deltas
+MAX_AGENTS = np.iinfo(DELTA_DTYPE['sender']).max + 1
+
+
+def _check_agent_count(n_agents: int):
+    if n_agents > MAX_AGENTS:
+        raise ValueError(
+            f"n_agents={n_agents} exceeds {MAX_AGENTS}, the most the one-byte delta sender field can address"
+        )
 
 
-@dataclass
-class PosteriorState:
-    """Beta distribution posterior for a principle-domain pair."""
-    alpha: float = 1.0
-    beta: float = 1.0
-    observations: int = 0
-
-    def update(self, success: bool):
-        if success:
-            self.alpha += 1.0
-        else:
-            self.beta += 1.0
-        self.observations += 1
-
-    def mean(self) -> float:
-        return self.alpha / (self.alpha + self.beta)
-
-    def variance(self) -> float:
-        s = self.alpha + self.beta
-        return (self.alpha * self.beta) / (s * s * (s + 1.0))
-
-    def decay(self, factor: float = 0.95):
-        """Apply forgetting factor."""
-        effective = self.observations * factor
-        total = self.alpha + self.beta
-        ratio = self.alpha / total
-        self.alpha = 1.0 + ratio * effective
-        self.beta = 1.0 + (1.0 - ratio) * effective
-        self.observations = int(effective)
-
-
-@dataclass
-class PosteriorDelta:
-    """Delta for sharing between agents."""
-    agent_id: str
-    key: str
-    alpha_delta: float
-    beta_delta: float
-    confidence: float
-
-
-@dataclass
-class Agent:
-    """Simulated swarm agent with local posteriors."""
-    agent_id: str
-    posteriors: Dict[str, PosteriorState] = field(default_factory=dict)
-    pending_deltas: List[PosteriorDelta] = field(default_factory=list)
-    sync_interval: int = 10
-    outcomes_since_sync: int = 0
-    forgetting_factor: float = 0.95
+def posterior_confidence(alpha, beta):
+    """Delta confidence 1 / (1 + variance) of Beta(alpha, beta) posteriors."""
+    # variance = ab / (s^2 (s+1)), so 1 / (1 + variance) needs one division
+    s = alpha + beta
+    spread = s * s * (s + 1.0)
+    return spread / (spread + alpha * beta)
 
-    def record_outcome(self, principle: str, domain: str, success: bool):
-        key = f"{principle}:{domain}"
-        if key not in self.posteriors:
-            self.posteriors[key] = PosteriorState()
 
-        old_alpha = self.posteriors[key].alpha
-        old_beta = self.posteriors[key].beta
+@dataclass(slots=True)
+class SwarmState:
+    """
+    Beta posteriors of every simulated agent, struct-of-arrays.
 
-        self.posteriors[key].update(success)
-        self.outcomes_since_sync += 1
+    alpha_evidence/beta_evidence are (n_agents, len(PRINCIPLES)) arrays of the
+    evidence on top of the Beta(1, 1) prior, indexed by agent and principle
+    index. Decay is lazy: instead of shrinking every cell, a pass grows
+    evidence_scale by 1/factor, new evidence is added multiplied by it and
+    reads divide by it, so alpha = 1 + alpha_evidence / evidence_scale.
 
-        # Create delta
-        delta = PosteriorDelta(
-            agent_id=self.agent_id,
-            key=key,
-            alpha_delta=self.posteriors[key].alpha - old_alpha,
-            beta_delta=self.posteriors[key].beta - old_beta,
-            confidence=1.0 / (1.0 + self.posteriors[key].variance()),
-        )
-        self.pending_deltas.append(delta)
+    Unsynced updates live in an (n_agents, SYNC_INTERVAL) ring buffer of
+    DELTA_DTYPE records; every agent records one outcome per step, so all
+    rows share one fill count.
+    """
+    alpha_evidence: np.ndarray
+    beta_evidence: np.ndarray
+    deltas: np.ndarray
+    row_offsets: np.ndarray  # flat index of each agent's first principle
+    evidence_scale: np.float32 = np.float32(1.0)
+    outcomes_since_sync: int = 0
 
-    def needs_sync(self) -> bool:
-        return self.outcomes_since_sync >= self.sync_interval
+    def __post_init__(self):
+        _check_agent_count(len(self.alpha_evidence))
+
+    @classmethod
+    def create(cls, n_agents: int) -> 'SwarmState':
+        _check_agent_count(n_agents)  # before the sender ids are cast to u1
+        shape = (n_agents, len(PRINCIPLES))
+        deltas = np.zeros((n_agents, SYNC_INTERVAL), dtype=DELTA_DTYPE)
+        deltas['sender'] = np.arange(n_agents)[:, None]
+        return cls(
+            alpha_evidence=np.zeros(shape, dtype=np.float32),
+            beta_evidence=np.zeros(shape, dtype=np.float32),
+            deltas=deltas,
+            row_offsets=np.arange(n_agents) * len(PRINCIPLES),
+        )
 
-    def get_deltas(self) -> List[PosteriorDelta]:
-        deltas = self.pending_deltas.copy()
-        self.pending_deltas.clear()
+    def _posterior(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Decayed (alpha, beta) of the given flat cells."""
+        inv_scale = 1.0 / self.evidence_scale
+        alpha = 1.0 + self.alpha_evidence.take(cells) * inv_scale
+        beta = 1.0 + self.beta_evidence.take(cells) * inv_scale
+        return alpha, beta
+
+    def means(self) -> np.ndarray:
+        inv_scale = 1.0 / self.evidence_scale
+        alpha = 1.0 + self.alpha_evidence * inv_scale
+        return alpha / (alpha + 1.0 + self.beta_evidence * inv_scale)
+
+    def record_outcomes(self, principles: np.ndarray, success: np.ndarray) -> np.ndarray:
+        """
+        Record one outcome per agent (agent i observed principles[i]) and
+        buffer it as a pending delta.
+
+        Returns each agent's posterior mean for its principle from before
+        the update, i.e. its prediction for this outcome.
+        """
+        # One cell per agent, so flat fancy-indexed updates never collide
+        cells = self.row_offsets + principles
+        alpha, beta = self._posterior(cells)
+        prediction = alpha / (alpha + beta)
+        self.alpha_evidence.reshape(-1)[cells] += success * self.evidence_scale
+        self.beta_evidence.reshape(-1)[cells] += ~success * self.evidence_scale
+
+        # Updated posteriors follow from the gathered ones, no second read
+        slot = self.outcomes_since_sync % SYNC_INTERVAL
+        pending = self.deltas[:, slot]
+        pending['principle'] = principles
+        pending['alpha_delta'] = success
+        pending['beta_delta'] = ~success
+        pending['confidence'] = posterior_confidence(alpha + success, beta + ~success)
+        self.outcomes_since_sync += 1
+        return prediction
+
+    def record_all_outcomes(self, principles: np.ndarray, success: np.ndarray) -> np.ndarray:
+        """
+        Record a whole (n_outcomes, n_agents) run with no sync or decay in between.
+
+        Without peers or forgetting, a cell's evidence is a running count, so
+        every step's prediction comes from exclusive cumulative sums instead
+        of a step loop. Returns the predictions, as record_outcomes would.
+        """
+        hits = principles[..., None] == np.arange(self.alpha_evidence.shape[1])
+        wins = hits & success[..., None]
+        losses = hits & ~success[..., None]
+        pick = principles[..., None]
+        wins_before = np.take_along_axis(np.cumsum(wins, axis=0, dtype=np.int32), pick, axis=2)[..., 0] - success
+        losses_before = np.take_along_axis(np.cumsum(losses, axis=0, dtype=np.int32), pick, axis=2)[..., 0] - ~success
+
+        alpha, beta = self._posterior(self.row_offsets + principles)
+        alpha += wins_before
+        beta += losses_before
+
+        self.alpha_evidence += wins.sum(axis=0) * self.evidence_scale
+        self.beta_evidence += losses.sum(axis=0) * self.evidence_scale
+        return alpha / (alpha + beta)
+
+    def get_deltas(self, delivered: np.ndarray) -> np.ndarray:
+        """
+        Drain every agent's pending deltas, keeping those marked in delivered.
+
+        delivered is an (n_agents, SYNC_INTERVAL) mask of messages that
+        survived transport. Returns the surviving DELTA_DTYPE records as one
+        packed array, i.e. the sync message (.tobytes() is its wire form).
+        """
+        count = min(self.outcomes_since_sync, SYNC_INTERVAL)
         self.outcomes_since_sync = 0
-        return deltas
-
-    def apply_peer_deltas(self, deltas: List[PosteriorDelta]):
-        for delta in deltas:
-            if delta.agent_id == self.agent_id:
-                continue
-
-            if delta.key not in self.posteriors:
-                self.posteriors[delta.key] = PosteriorState()
-
-            posterior = self.posteriors[delta.key]
-            local_conf = 1.0 / (1.0 + posterior.variance())
-            peer_weight = delta.confidence / (local_conf + delta.confidence)
-
-            posterior.alpha += delta.alpha_delta * peer_weight
-            posterior.beta += delta.beta_delta * peer_weight
+        return self.deltas[:, :count][delivered[:, :count]]
+
+    def apply_peer_deltas(self, deltas: np.ndarray):
+        """Merge every delivered delta into every agent except its sender."""
+        if not len(deltas):
+            return
+        senders = deltas['sender']
+        alpha_delta = deltas['alpha_delta']
+        beta_delta = deltas['beta_delta']
+        confidence = deltas['confidence']
+
+        # One row per (receiver, delta) pair; peer weights use the
+        # receiver's posteriors as of the start of the sync
+        receivers, index = np.nonzero(senders != np.arange(self.alpha_evidence.shape[0])[:, None])
+        cells = self.row_offsets[receivers] + deltas['principle'][index]
+
+        # Many deltas land on the same (receiver, principle) cell, so read
+        # every cell's confidence once and segment-sum the weighted deltas
+        inv_scale = 1.0 / self.evidence_scale
+        local_conf = posterior_confidence(
+            1.0 + self.alpha_evidence * inv_scale,
+            1.0 + self.beta_evidence * inv_scale,
+        ).take(cells)
+        peer_conf = confidence[index]
+        peer_weight = peer_conf / (local_conf + peer_conf) * self.evidence_scale
+
+        n_cells = self.alpha_evidence.size
+        self.alpha_evidence += np.bincount(cells, alpha_delta[index] * peer_weight, n_cells).reshape(self.alpha_evidence.shape)
+        self.beta_evidence += np.bincount(cells, beta_delta[index] * peer_weight, n_cells).reshape(self.beta_evidence.shape)
+
+    def apply_decay(self, factor: float = FORGETTING_FACTOR):
+        """Apply forgetting factor to every posterior."""
+        self.evidence_scale /= factor
+        if self.evidence_scale > _MAX_EVIDENCE_SCALE:
+            # Fold the scale back into the evidence before it loses precision
+            self.alpha_evidence /= self.evidence_scale
+            self.beta_evidence /= self.evidence_scale
+            self.evidence_scale = np.float32(1.0)
+
+
+def _run_sync_steps(alpha_evidence, beta_evidence, principles, success, delivered,
+                    sync_interval, decay_interval, factor, predictions):
+    """
+    Run every outcome step of a synced simulate_swarm as one loop, in place.
 
-    def apply_decay(self):
-        for posterior in self.posteriors.values():
-            posterior.decay(self.forgetting_factor)
+    Same update rules as the SwarmState methods, written as scalar loops so
+    numba can compile the whole simulation; only used when numba is available.
+    Returns the final evidence scale.
+    """
+    n_outcomes, n_agents = principles.shape
+    n_principles = alpha_evidence.shape[1]
+    delta_principle = np.empty((n_agents, sync_interval), dtype=np.int64)
+    delta_success = np.empty((n_agents, sync_interval), dtype=np.bool_)
+    delta_conf = np.empty((n_agents, sync_interval), dtype=np.float32)
+    local_conf = np.empty((n_agents, n_principles), dtype=np.float32)
+    scale = 1.0
+
+    for step in range(n_outcomes):
+        inv_scale = 1.0 / scale
+        slot = step % sync_interval
+        for agent in range(n_agents):
+            pid = principles[step, agent]
+            a = 1.0 + alpha_evidence[agent, pid] * inv_scale
+            b = 1.0 + beta_evidence[agent, pid] * inv_scale
+            predictions[step, agent] = a / (a + b)
+
+            ok = success[step, agent]
+            if ok:
+                alpha_evidence[agent, pid] += scale
+                a += 1.0
+            else:
+                beta_evidence[agent, pid] += scale
+                b += 1.0
+
+            s = a + b
+            spread = s * s * (s + 1.0)
+            delta_principle[agent, slot] = pid
+            delta_success[agent, slot] = ok
+            delta_conf[agent, slot] = spread / (spread + a * b)
+
+        if slot == sync_interval - 1:
+            # Peer weights use each receiver's posteriors from the start of the
+            # sync, so every cell's confidence is computed once up front
+            for agent in range(n_agents):
+                for pid in range(n_principles):
+                    a = 1.0 + alpha_evidence[agent, pid] * inv_scale
+                    b = 1.0 + beta_evidence[agent, pid] * inv_scale
+                    s = a + b
+                    spread = s * s * (s + 1.0)
+                    local_conf[agent, pid] = spread / (spread + a * b)
+            mask = delivered[step // sync_interval]
+            for receiver in range(n_agents):
+                for sender in range(n_agents):
+                    if sender == receiver:
+                        continue
+                    for sent in range(sync_interval):
+                        if not mask[sender, sent]:
+                            continue
+                        pid = delta_principle[sender, sent]
+                        peer_conf = np.float64(delta_conf[sender, sent])
+                        peer_weight = peer_conf / (local_conf[receiver, pid] + peer_conf) * scale
+                        if delta_success[sender, sent]:
+                            alpha_evidence[receiver, pid] += peer_weight
+                        else:
+                            beta_evidence[receiver, pid] += peer_weight
+
+        if step % decay_interval != decay_interval - 1:
+            continue
+        scale /= factor
+        if scale > _MAX_EVIDENCE_SCALE:
+            alpha_evidence /= scale
+            beta_evidence /= scale
+            scale = 1.0
+
+    return scale
+
+
+if NUMBA_AVAILABLE:
+    _run_sync_steps = njit(cache=True, fastmath=True)(_run_sync_steps)
+
+
+@lru_cache(maxsize=8)
+def _draw_outcomes(n_agents: int, n_outcomes: int, drift_rate: float, seed: int):
+    """
+    Draw every step's principle and outcome for every agent, shape (n_outcomes, n_agents).
 
-    def get_probability(self, principle: str, domain: str) -> float:
-        key = f"{principle}:{domain}"
-        if key in self.posteriors:
-            return self.posteriors[key].mean()
-        return 0.5
+    Outcomes never depend on the posteriors, so runs that differ only in
+    their sync settings share one set of draws. They are cached read-only
+    together with the generator state they leave behind, which the sync
+    loss draws continue from.
 
-    def get_variance(self, principle: str, domain: str) -> float:
-        key = f"{principle}:{domain}"
-        if key in self.posteriors:
-            return self.posteriors[key].variance()
-        return 0.25  # High uncertainty
+    Returns (principles, success, seen, rng_state).
+    """
+    rng = np.random.default_rng(seed)
 
+    shape = (n_outcomes, n_agents)
 
-def calculate_agent_drift(agents: List[Agent]) -> Dict[str, float]:
-    """Calculate drift (variance) across agents for each key."""
-    drift = {}
+    # Pick a random principle
+    principles = rng.integers(0, len(PRINCIPLES), shape)
+    base_rate = GROUND_TRUTH[principles]
 
-    # Collect all keys
-    all_keys = set()
-    for agent in agents:
-        all_keys.update(agent.posteriors.keys())
+    # Apply drift: each agent sees slightly different rate, shifted by up to ±20%;
+    # different agents drift in different directions
+    agents = np.arange(n_agents)
+    drifted = rng.random(shape) < drift_rate
+    drift_shift = rng.uniform(-0.20, 0.20, shape) * np.where(agents % 2 == 0, 1.0, -1.0)
+    effective_rate = np.where(drifted, np.clip(base_rate + drift_shift, 0.1, 0.9), base_rate)
 
-    for key in all_keys:
-        probs = [agent.posteriors.get(key, PosteriorState()).mean() for agent in agents]
-        if len(probs) > 1:
-            mean = sum(probs) / len(probs)
-            variance = sum((p - mean) ** 2 for p in probs) / len(probs)
-            drift[key] = math.sqrt(variance)
+    # Sample outcome
+    success = rng.random(shape) < effective_rate
+    seen = np.zeros(len(PRINCIPLES), dtype=bool)
+    seen[principles] = True
 
-    return drift
+    for array in (principles, success, seen):
+        array.flags.writeable = False
+    return principles, success, seen, rng.bit_generator.state
 
 
 def simulate_swarm(
@@ -171,104 +355,81 @@ def simulate_swarm(
     drift_rate: float,
     sync_enabled: bool,
     sync_failure_rate: float = 0.0,
+    seed: int = 42,
 ) -> Dict:
     """
     Simulate multi-agent swarm with optional drift and sync.
 
+    Randomness is drawn for the whole run at once; each outcome step then
+    applies one outcome per agent to the swarm's posterior arrays.
+
     Args:
         n_agents: Number of agents
         n_outcomes: Total outcomes per agent
         drift_rate: Rate at which agents see different distributions
         sync_enabled: Whether to enable delta syncing
         sync_failure_rate: Rate at which sync messages are lost
+        seed: Seed of the run's random stream
 
     Returns:
-        Metrics dict
+        Metrics dict (ValueError if n_agents exceeds MAX_AGENTS)
     """
-    random.seed(42)
-    agents = [Agent(f"agent-{i}") for i in range(n_agents)]
-
-    # Ground truth success rates
-    ground_truth = {
-        'yagni:architecture': 0.75,
-        'kiss:architecture': 0.70,
-        'tdd:testing': 0.80,
-        'red-green-refactor:testing': 0.65,
-        'horizontal-scale:scaling': 0.60,
-        'brooks-law:management': 0.85,
-        'defense-in-depth:security': 0.70,
-        'measure-first:performance': 0.75,
-    }
-
-    # Track predictions vs outcomes
-    predictions = []
-    outcomes = []
-
-    for _ in range(n_outcomes):
-        for agent_idx, agent in enumerate(agents):
-            # Pick a random principle
-            principle, domain = random.choice(PRINCIPLES)
-            key = f"{principle}:{domain}"
-            base_rate = ground_truth.get(key, 0.5)
-
-            # Apply drift: each agent sees slightly different rate
-            if random.random() < drift_rate:
-                # Drift: shift by up to ±20%
-                drift_shift = random.uniform(-0.20, 0.20)
-                # Different agents drift in different directions
-                drift_shift *= (1 if agent_idx % 2 == 0 else -1)
-                effective_rate = max(0.1, min(0.9, base_rate + drift_shift))
-            else:
-                effective_rate = base_rate
-
-            # Sample outcome
-            success = random.random() < effective_rate
-
-            # Record prediction before updating
-            pred = agent.get_probability(principle, domain)
-            predictions.append(pred)
-            outcomes.append(1.0 if success else 0.0)
-
-            # Update agent
-            agent.record_outcome(principle, domain, success)
-
-        # Sync if enabled
-        if sync_enabled:
-            # Collect deltas from agents that need sync
-            all_deltas = []
-            for agent in agents:
-                if agent.needs_sync():
-                    deltas = agent.get_deltas()
-                    # Apply sync failure rate
-                    deltas = [d for d in deltas if random.random() > sync_failure_rate]
-                    all_deltas.extend(deltas)
-
-            # Distribute deltas
-            for agent in agents:
-                agent.apply_peer_deltas(all_deltas)
-                agent.apply_decay()
+    _check_agent_count(n_agents)
+    principles, success, seen, rng_state = _draw_outcomes(n_agents, n_outcomes, drift_rate, seed)
+    swarm = SwarmState.create(n_agents)
+    shape = principles.shape
+
+    # Simulate message loss for every sync round up front too
+    n_syncs = n_outcomes // SYNC_INTERVAL if sync_enabled else 0
+    if sync_enabled and sync_failure_rate > 0:
+        rng = np.random.default_rng()
+        rng.bit_generator.state = rng_state
+        delivered = rng.random((n_syncs, n_agents, SYNC_INTERVAL)) > sync_failure_rate
+    else:
+        delivered = np.ones((n_syncs, n_agents, SYNC_INTERVAL), dtype=bool)
+
+    # Track predictions vs outcomes; float32 is ample for accuracy and Brier
+    predictions = np.empty(shape, dtype=np.float32)
+
+    if not sync_enabled:
+        predictions[:] = swarm.record_all_outcomes(principles, success)
+    elif NUMBA_AVAILABLE:
+        swarm.evidence_scale = _run_sync_steps(
+            swarm.alpha_evidence, swarm.beta_evidence, principles, success, delivered,
+            SYNC_INTERVAL, DECAY_INTERVAL, FORGETTING_FACTOR, predictions,
+        )
+    else:
+        for step in range(n_outcomes):
+            # Update agents, recording their predictions from before the update
+            predictions[step] = swarm.record_outcomes(principles[step], success[step])
+
+            # Every agent records one outcome per step, so all of them come
+            # due for sync and decay on the same steps
+            if step % SYNC_INTERVAL == SYNC_INTERVAL - 1:
+                swarm.apply_peer_deltas(swarm.get_deltas(delivered[step // SYNC_INTERVAL]))
+            if step % DECAY_INTERVAL == DECAY_INTERVAL - 1:
+                swarm.apply_decay()
 
     # Calculate metrics
-    drift_map = calculate_agent_drift(agents)
-    avg_drift = sum(drift_map.values()) / len(drift_map) if drift_map else 0
+    means = swarm.means()
+    # Drift: std across agents of each principle seen by any agent
+    drift = means.std(axis=0)[seen] if n_agents > 1 else np.empty(0)
+    drift_map = dict(zip(compress(PRINCIPLE_KEYS, seen.tolist()), drift.tolist()))
+    avg_drift = float(drift.mean()) if drift.size else 0
 
     # Accuracy: prediction > 0.5 matches outcome
-    correct = sum(1 for p, o in zip(predictions, outcomes)
-                  if (p >= 0.5) == (o >= 0.5))
-    accuracy = correct / len(predictions) if predictions else 0
+    accuracy = float(np.mean((predictions >= 0.5) == success))
 
     # Brier score
-    brier = sum((p - o) ** 2 for p, o in zip(predictions, outcomes)) / len(predictions)
+    brier = float(np.mean(np.square(predictions - success)))
 
     # Consensus: average probability across agents for each key
-    consensus_probs = {}
-    for key in ground_truth.keys():
-        probs = [agent.posteriors.get(key, PosteriorState()).mean() for agent in agents]
-        consensus_probs[key] = sum(probs) / len(probs)
+    consensus = means.mean(axis=0)
+    # Unseen principles sit at the prior's 0.5, so every key has an entry
+    consensus_probs = dict(zip(PRINCIPLE_KEYS, consensus.tolist()))
 
     # MAE from ground truth
-    mae = sum(abs(consensus_probs.get(k, 0.5) - v)
-              for k, v in ground_truth.items()) / len(ground_truth)
+    mae = float(np.mean(np.abs(consensus - GROUND_TRUTH)))
 
     return {
         'accuracy': accuracy,
@@ -381,17 +542,37 @@ def probe_high_drift_stress():
     return metrics_no_sync, metrics_with_sync
 
 
+def _run_probe(probe_fn):
+    """Run one probe in a worker, returning its result and captured output."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        result = probe_fn()
+    return result, buf.getvalue()
+
+
 def main():
     print("\n" + "╔" + "═"*58 + "╗")
     print("║  🌊 V4 SWARM DRIFT PROBE                                 ║")
     print("║     Testing SwarmPosterior under adversarial drift       ║")
     print("╚" + "═"*58 + "╝")
 
-    # Run probes
-    baseline = probe_drift_without_sync()
-    with_sync = probe_drift_with_sync()
-    with_loss = probe_sync_failure()
-    stress_no, stress_yes = probe_high_drift_stress()
+    probes = [
+        probe_drift_without_sync,
+        probe_drift_with_sync,
+        probe_sync_failure,
+        probe_high_drift_stress,
+    ]
+
+    # Every probe runs its own seeded simulations, so run them side by side
+    # and replay each one's output in order once it finishes
+    results = []
+    with ProcessPoolExecutor(max_workers=len(probes)) as pool:
+        futures = [pool.submit(_run_probe, probe_fn) for probe_fn in probes]
+        for future in futures:
+            result, output = future.result()
+            sys.stdout.write(output)
+            results.append(result)
+    baseline, with_sync, with_loss, (stress_no, stress_yes) = results
 
     # Summary
     print("\n" + "="*60)
@@ -456,5 +637,4 @@ def main():
 
 
 if __name__ == '__main__':
-    import sys
     sys.exit(0 if main() else 1)
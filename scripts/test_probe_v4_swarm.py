@@ -0,0 +1,32 @@
+"""Tests for the agent-count limit of the V4 swarm probe."""
+
+import numpy as np
+import pytest
+
+from probe_v4_swarm import MAX_AGENTS, PRINCIPLES, SwarmState, simulate_swarm
+
+
+def test_create_accepts_max_agents():
+    swarm = SwarmState.create(MAX_AGENTS)
+    assert swarm.deltas['sender'][-1, 0] == MAX_AGENTS - 1
+
+
+def test_create_rejects_agents_beyond_sender_field():
+    with pytest.raises(ValueError):
+        SwarmState.create(MAX_AGENTS + 1)
+
+
+def test_init_rejects_agents_beyond_sender_field():
+    shape = (MAX_AGENTS + 1, len(PRINCIPLES))
+    with pytest.raises(ValueError):
+        SwarmState(
+            alpha_evidence=np.zeros(shape, dtype=np.float32),
+            beta_evidence=np.zeros(shape, dtype=np.float32),
+            deltas=np.zeros((MAX_AGENTS + 1, 1)),
+            row_offsets=np.arange(MAX_AGENTS + 1) * len(PRINCIPLES),
+        )
+
+
+def test_simulate_swarm_rejects_agents_beyond_sender_field():
+    with pytest.raises(ValueError):
+        simulate_swarm(n_agents=MAX_AGENTS + 1, n_outcomes=10, drift_rate=0.0, sync_enabled=True)
@@ -0,0 +1,129 @@
+"""Tests for the neural bandit networks: loading pre-fusion checkpoints and ONNX export."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+nn = torch.nn
+F = torch.nn.functional
+
+from train_neural_bandit import NeuralPosteriorV1, NeuralPosteriorV2, PosteriorOutputs, export_onnx
+
+CONTEXT_DIM, NUM_PRINCIPLES, NUM_THINKERS = 31, 20, 5
+
+
+class LegacyPosteriorV2(nn.Module):
+    """V2 as checkpointed before the series: MultiheadAttention, one encoder Sequential, two heads."""
+
+    def __init__(self, embed_dim=128, hidden_dim=256, dropout=0.2):
+        super().__init__()
+        self.principle_embed = nn.Embedding(NUM_PRINCIPLES, embed_dim)
+        self.thinker_embed = nn.Embedding(NUM_THINKERS, embed_dim)
+        self.context_encoder = nn.Sequential(
+            nn.Linear(CONTEXT_DIM, hidden_dim), nn.LayerNorm(hidden_dim), nn.ReLU(), nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim), nn.LayerNorm(hidden_dim), nn.ReLU(), nn.Dropout(dropout),
+        )
+        self.context_attention = nn.MultiheadAttention(hidden_dim, 8, dropout=dropout, batch_first=True)
+        self.attn_norm = nn.LayerNorm(hidden_dim)
+        self.combiner = nn.Sequential(
+            nn.Linear(hidden_dim + 2 * embed_dim, hidden_dim), nn.LayerNorm(hidden_dim), nn.ReLU(),
+            nn.Dropout(dropout), nn.Linear(hidden_dim, hidden_dim // 2), nn.LayerNorm(hidden_dim // 2), nn.ReLU(),
+        )
+        self.success_head = nn.Linear(hidden_dim // 2, 1)
+        self.uncertainty_head = nn.Linear(hidden_dim // 2, 1)
+
+    def forward(self, context, arm_indices):
+        ctx_encoded = self.context_encoder(context)
+        ctx_seq = ctx_encoded.unsqueeze(1)
+        ctx_attended, _ = self.context_attention(ctx_seq, ctx_seq, ctx_seq)
+        ctx_attended = self.attn_norm(ctx_attended.squeeze(1) + ctx_encoded)
+        combined = torch.cat([
+            ctx_attended, self.principle_embed(arm_indices[:, 0]), self.thinker_embed(arm_indices[:, 1]),
+        ], dim=1)
+        hidden = self.combiner(combined)
+        return torch.sigmoid(self.success_head(hidden)), F.softplus(self.uncertainty_head(hidden))
+
+
+class LegacyPosteriorV1(nn.Module):
+    """V1 as checkpointed before the series."""
+
+    def __init__(self, embed_dim=64, hidden_dim=128, dropout=0.1):
+        super().__init__()
+        self.principle_embed = nn.Embedding(NUM_PRINCIPLES, embed_dim)
+        self.thinker_embed = nn.Embedding(NUM_THINKERS, embed_dim)
+        self.context_encoder = nn.Sequential(
+            nn.Linear(CONTEXT_DIM, hidden_dim), nn.ReLU(), nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim), nn.ReLU(), nn.Dropout(dropout),
+        )
+        self.context_attention = nn.MultiheadAttention(hidden_dim, 4, dropout=dropout, batch_first=True)
+        self.combiner = nn.Sequential(
+            nn.Linear(hidden_dim + 2 * embed_dim, hidden_dim), nn.ReLU(), nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim // 2), nn.ReLU(),
+        )
+        self.success_head = nn.Linear(hidden_dim // 2, 1)
+        self.uncertainty_head = nn.Linear(hidden_dim // 2, 1)
+
+    def forward(self, context, arm_indices):
+        ctx_seq = self.context_encoder(context).unsqueeze(1)
+        ctx_attended, _ = self.context_attention(ctx_seq, ctx_seq, ctx_seq)
+        combined = torch.cat([
+            ctx_attended.squeeze(1), self.principle_embed(arm_indices[:, 0]), self.thinker_embed(arm_indices[:, 1]),
+        ], dim=1)
+        hidden = self.combiner(combined)
+        return torch.sigmoid(self.success_head(hidden)), F.softplus(self.uncertainty_head(hidden))
+
+
+def _inputs(batch=8):
+    context = torch.zeros(batch, CONTEXT_DIM)
+    context[torch.arange(batch), torch.randint(0, CONTEXT_DIM - 6, (batch,))] = 1.0
+    context[:, -6:] = torch.rand(batch, 6)
+    arms = torch.stack([torch.randint(0, NUM_PRINCIPLES, (batch,)), torch.randint(0, NUM_THINKERS, (batch,))], dim=1)
+    return context, arms
+
+
+@pytest.mark.parametrize("legacy_cls, model_cls", [
+    (LegacyPosteriorV2, NeuralPosteriorV2),
+    (LegacyPosteriorV1, NeuralPosteriorV1),
+])
+def test_pre_series_state_dict_loads_with_same_outputs(legacy_cls, model_cls):
+    torch.manual_seed(0)
+    legacy = legacy_cls().eval()
+    # Non-zero attention biases, so the fold's bias term is exercised
+    nn.init.normal_(legacy.context_attention.in_proj_bias)
+    nn.init.normal_(legacy.context_attention.out_proj.bias)
+
+    model = model_cls(CONTEXT_DIM, NUM_PRINCIPLES, NUM_THINKERS)
+    model.load_state_dict(legacy.state_dict())  # strict
+
+    context, arms = _inputs()
+    with torch.no_grad():
+        expected = legacy(context, arms)
+        actual = PosteriorOutputs(model).eval()(context, arms)
+    for want, got in zip(expected, actual):
+        torch.testing.assert_close(got, want, rtol=1e-4, atol=1e-5)
+
+
+def test_current_state_dict_round_trips():
+    model = NeuralPosteriorV2(CONTEXT_DIM, NUM_PRINCIPLES, NUM_THINKERS)
+    state_dict = model.state_dict()
+    reloaded = NeuralPosteriorV2(CONTEXT_DIM, NUM_PRINCIPLES, NUM_THINKERS)
+    reloaded.load_state_dict(state_dict)
+    for key, value in reloaded.state_dict().items():
+        assert torch.equal(value, state_dict[key])
+
+
+def test_rms_norm_model_exports_to_onnx(tmp_path):
+    pytest.importorskip("onnx")
+    torch.manual_seed(0)
+    model = NeuralPosteriorV2(CONTEXT_DIM, NUM_PRINCIPLES, NUM_THINKERS, rms_norm=True)
+    path = tmp_path / "rms.onnx"
+    export_onnx(model, CONTEXT_DIM, str(path))
+    assert path.stat().st_size > 0
+
+    ort = pytest.importorskip("onnxruntime")
+    context, arms = _inputs()
+    session = ort.InferenceSession(str(path))
+    got = session.run(None, {'context': context.numpy(), 'arm_indices': arms.numpy()})
+    with torch.no_grad():
+        expected = PosteriorOutputs(model).eval()(context, arms)
+    for want, actual in zip(expected, got):
+        torch.testing.assert_close(torch.from_numpy(actual), want, rtol=1e-4, atol=1e-5)
@@ -11,23 +11,52 @@ Usage:
 """
 
 import argparse
+import gc
 import json
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import numpy as np
 
+# orjson decodes several times faster than stdlib json (both accept bytes)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Check for torch availability
 try:
     import torch
     import torch.nn as nn
     import torch.nn.functional as F
-    from torch.utils.data import Dataset, DataLoader
+    from torch.utils.data import Dataset
     TORCH_AVAILABLE = True
 except ImportError:
     TORCH_AVAILABLE = False
     print("Warning: PyTorch not installed. Install with: pip install torch")
 
+# difficulty, position_rank, confidence, domain_match, total_principles_selected, is_for_position
+NUM_SCALAR_FEATURES = 6
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspend cyclic garbage collection for a bulk load.
+
+    Parsing creates millions of long-lived dicts and tuples; every young
+    collection rescans them for cycles that cannot exist.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
 
 class NeuralBanditDataset(Dataset):
     """Dataset for neural bandit training examples."""
@@ -42,11 +71,11 @@ class NeuralBanditDataset(Dataset):
         self.thinker_vocab = {}
 
         # Load examples
-        with open(jsonl_path, 'r') as f:
+        with open(jsonl_path, 'rb') as f, gc_paused():
             for i, line in enumerate(f):
                 if max_examples and i >= max_examples:
                     break
-                ex = json.loads(line.strip())
+                ex = json_loads(line)
                 self.examples.append(ex)
 
                 # Build vocabularies
@@ -58,6 +87,9 @@ class NeuralBanditDataset(Dataset):
                 self._add_to_vocab(self.principle_vocab, ex['principle_id'])
                 self._add_to_vocab(self.thinker_vocab, ex['thinker_id'])
 
+        with gc_paused():
+            self._build_arrays()
+
         print(f"Loaded {len(self.examples)} examples")
         print(f"Vocabularies: domains={len(self.domain_vocab)}, principles={len(self.principle_vocab)}, thinkers={len(self.thinker_vocab)}")
 
@@ -65,61 +97,87 @@ class NeuralBanditDataset(Dataset):
         if item not in vocab:
             vocab[item] = len(vocab)
 
-    def __len__(self):
-        return len(self.examples)
-
-    def __getitem__(self, idx) -> Tuple[torch.Tensor, torch.Tensor, float]:
-        ex = self.examples[idx]
-        ctx = ex['context_features']
-
-        # Build feature vector
-        features = []
-
-        # Domain one-hot
-        domain_vec = [0.0] * len(self.domain_vocab)
-        domain_vec[self.domain_vocab.get(ex['domain'], 0)] = 1.0
-        features.extend(domain_vec)
-
-        # Stakeholder one-hot
-        stakeholder_vec = [0.0] * len(self.stakeholder_vocab)
-        stakeholder_vec[self.stakeholder_vocab.get(ctx['stakeholder'], 0)] = 1.0
-        features.extend(stakeholder_vec)
-
-        # Company stage one-hot
-        stage_vec = [0.0] * len(self.stage_vocab)
-        stage_vec[self.stage_vocab.get(ctx['company_stage'], 0)] = 1.0
-        features.extend(stage_vec)
-
-        # Urgency one-hot
-        urgency_vec = [0.0] * len(self.urgency_vocab)
-        urgency_vec[self.urgency_vocab.get(ctx['urgency'], 0)] = 1.0
-        features.extend(urgency_vec)
+    def _build_arrays(self):
+        """
+        Precompute every example's features once, in index form.
 
-        # Scalar features (normalized)
-        features.append(ex['difficulty'] / 5.0)
-        features.append(ex['position_rank'] / 10.0)
-        features.append(ex['confidence'])
-        features.append(1.0 if ctx['domain_match'] else 0.0)
-        features.append(ctx['total_principles_selected'] / 10.0)
-        features.append(1.0 if ctx['is_for_position'] else 0.0)
+        Context rows are [domain | stakeholder | stage | urgency one-hots |
+        NUM_SCALAR_FEATURES scalars], the layout the Rust scorer rebuilds.
+        Rather than materializing the mostly-zero one-hot matrix, each row
+        stores the column of its four hot entries (cat_columns) and the
+        scalar tail (scalars); see one_hot_linear.
+        """
+        n = len(self.examples)
+        domain_idx, stakeholder_idx, stage_idx, urgency_idx = [], [], [], []
+        scalars = []
+        arms = []
+        labels = []
+
+        for ex in self.examples:
+            ctx = ex['context_features']
+            domain_idx.append(self.domain_vocab[ex['domain']])
+            stakeholder_idx.append(self.stakeholder_vocab[ctx['stakeholder']])
+            stage_idx.append(self.stage_vocab[ctx['company_stage']])
+            urgency_idx.append(self.urgency_vocab[ctx['urgency']])
+
+            # Scalar features (normalized)
+            scalars.append((
+                ex['difficulty'] / 5.0,
+                ex['position_rank'] / 10.0,
+                ex['confidence'],
+                1.0 if ctx['domain_match'] else 0.0,
+                ctx['total_principles_selected'] / 10.0,
+                1.0 if ctx['is_for_position'] else 0.0,
+            ))
+
+            # Principle and thinker embedding indices
+            arms.append((self.principle_vocab[ex['principle_id']], self.thinker_vocab[ex['thinker_id']]))
+            labels.append(ex['success'])
+
+        # Hot column of each one-hot block: block offset + vocab index
+        self.cat_columns = np.empty((n, 4), dtype=np.int64)
+        offset = 0
+        for i, (vocab, idx) in enumerate((
+            (self.domain_vocab, domain_idx),
+            (self.stakeholder_vocab, stakeholder_idx),
+            (self.stage_vocab, stage_idx),
+            (self.urgency_vocab, urgency_idx),
+        )):
+            self.cat_columns[:, i] = offset + np.asarray(idx, dtype=np.int64)
+            offset += len(vocab)
+        self.scalars = np.asarray(scalars, dtype=np.float32).reshape(n, NUM_SCALAR_FEATURES)
+
+        self.arms = np.asarray(arms, dtype=np.int64).reshape(n, 2)
+        self.labels = np.asarray(labels, dtype=np.float32)
+        self._context_dim = offset + NUM_SCALAR_FEATURES
+
+    def _one_hot_dim(self) -> int:
+        return (len(self.domain_vocab) + len(self.stakeholder_vocab)
+                + len(self.stage_vocab) + len(self.urgency_vocab))
 
-        # Principle embedding index
-        principle_idx = self.principle_vocab.get(ex['principle_id'], 0)
+    def __len__(self):
+        return len(self.examples)
 
-        # Thinker embedding index
-        thinker_idx = self.thinker_vocab.get(ex['thinker_id'], 0)
+    def __getitem__(self, idx) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        # Dense one-hot context, as the ONNX model consumes it
+        features = np.zeros(self._context_dim, dtype=np.float32)
+        features[self.cat_columns[idx]] = 1.0
+        features[-NUM_SCALAR_FEATURES:] = self.scalars[idx]
 
-        context_tensor = torch.tensor(features, dtype=torch.float32)
-        arm_tensor = torch.tensor([principle_idx, thinker_idx], dtype=torch.long)
-        label = ex['success']
+        context_tensor = torch.from_numpy(features)
+        arm_tensor = torch.from_numpy(self.arms[idx])
+        label = torch.tensor(self.labels[idx])  # 0-d float32, collates to a tensor
 
         return context_tensor, arm_tensor, label
 
+    def arrays(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(cat_columns, scalars, arms, labels) rows of the given examples, as contiguous copies."""
+        return self.cat_columns[indices], self.scalars[indices], self.arms[indices], self.labels[indices]
+
     @property
     def context_dim(self) -> int:
         """Dimension of context feature vector."""
-        sample = self[0]
-        return sample[0].shape[0]
+        return self._context_dim
 
     @property
     def num_principles(self) -> int:
@@ -130,6 +188,103 @@ class NeuralBanditDataset(Dataset):
         return len(self.thinker_vocab)
 
 
+class RMSNorm(nn.Module):
+    """
+    RMSNorm from primitive ops (same parameters as nn.RMSNorm).
+
+    The tracing ONNX exporter has no symbolic for aten::rms_norm at opset 14;
+    pow/mean/rsqrt/mul export everywhere and Inductor still fuses them.
+    """
+
+    def __init__(self, dim: int, eps: float = torch.finfo(torch.float32).eps):
+        super().__init__()
+        self.eps = eps
+        self.weight = nn.Parameter(torch.ones(dim))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return x * torch.rsqrt(x.pow(2).mean(-1, keepdim=True) + self.eps) * self.weight
+
+
+def one_hot_linear(
+    linear: nn.Linear,
+    context: torch.Tensor,
+    scalars: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """
+    linear(context) for a one-hot context, optionally given in index form.
+
+    With scalars=None, context is the dense (batch, context_dim) vector the
+    ONNX graph takes. Otherwise context is (batch, 4) hot column indices and
+    scalars the (batch, NUM_SCALAR_FEATURES) tail: the matmul then reduces to
+    summing four weight columns, with no multiplies by zero.
+    """
+    if scalars is None:
+        return linear(context)
+    weight = linear.weight
+    return (weight.t()[context].sum(dim=1)
+            + F.linear(scalars, weight[:, -NUM_SCALAR_FEATURES:], linear.bias))
+
+
+def fold_context_attention(module: nn.Module, state_dict: dict, prefix: str, *args):
+    """
+    load_state_dict pre-hook folding a length-1 MultiheadAttention into context_proj.
+
+    Over a single token the attention weight is 1, so the block computed
+    out_proj(v_proj(x)); composing the two Linears gives context_proj exactly:
+    W = W_out @ W_v, b = W_out @ b_v + b_out.
+    """
+    in_weight_key = f'{prefix}context_attention.in_proj_weight'
+    if in_weight_key not in state_dict:
+        return
+    in_weight = state_dict.pop(in_weight_key)
+    in_bias = state_dict.pop(f'{prefix}context_attention.in_proj_bias')
+    out_weight = state_dict.pop(f'{prefix}context_attention.out_proj.weight')
+    out_bias = state_dict.pop(f'{prefix}context_attention.out_proj.bias')
+
+    hidden = out_weight.shape[0]
+    v_weight = in_weight[2 * hidden:]
+    v_bias = in_bias[2 * hidden:]
+    state_dict[f'{prefix}context_proj.weight'] = out_weight @ v_weight
+    state_dict[f'{prefix}context_proj.bias'] = out_weight @ v_bias + out_bias
+
+
+def split_context_input(module: nn.Module, state_dict: dict, prefix: str, *args):
+    """
+    load_state_dict pre-hook for checkpoints with the input Linear inside context_encoder.
+
+    That layout stored it as context_encoder.0; it is now context_input and
+    every later encoder layer sits one index lower.
+    """
+    encoder = f'{prefix}context_encoder.'
+    if f'{prefix}context_input.weight' in state_dict or f'{encoder}0.weight' not in state_dict:
+        return
+    # Pop everything first so renamed keys cannot collide with pending ones
+    old = [(key, state_dict.pop(key)) for key in list(state_dict) if key.startswith(encoder)]
+    for key, value in old:
+        index, _, name = key[len(encoder):].partition('.')
+        if index == '0':
+            state_dict[f'{prefix}context_input.{name}'] = value
+        else:
+            state_dict[f'{encoder}{int(index) - 1}.{name}'] = value
+
+
+def merge_output_heads(module: nn.Module, state_dict: dict, prefix: str, *args):
+    """
+    load_state_dict pre-hook upgrading separate success/uncertainty heads.
+
+    Checkpoints written before the heads were fused store success_head and
+    uncertainty_head as two (1, hidden) Linears; stacked row-wise they are
+    exactly out_head.
+    """
+    for name in ('weight', 'bias'):
+        success_key = f'{prefix}success_head.{name}'
+        uncertainty_key = f'{prefix}uncertainty_head.{name}'
+        if success_key in state_dict and uncertainty_key in state_dict:
+            state_dict[f'{prefix}out_head.{name}'] = torch.cat(
+                [state_dict.pop(success_key), state_dict.pop(uncertainty_key)]
+            )
+
+
 class NeuralPosteriorV2(nn.Module):
     """
     Neural posterior network for principle selection (V2 - SOTA 2026).
@@ -152,6 +307,7 @@ class NeuralPosteriorV2(nn.Module):
         embed_dim: int = 128,  # Increased from 64
         hidden_dim: int = 256,  # Increased from 128
         dropout: float = 0.2,  # Increased from 0.1
+        rms_norm: bool = False,  # RMSNorm instead of LayerNorm
     ):
         super().__init__()
 
@@ -163,56 +319,56 @@ class NeuralPosteriorV2(nn.Module):
         self.principle_embed = nn.Embedding(num_principles, embed_dim)
         self.thinker_embed = nn.Embedding(num_thinkers, embed_dim)
 
-        # Context encoder with LayerNorm
+        # RMSNorm skips the mean subtraction: one reduction per row instead of two
+        norm = RMSNorm if rms_norm else nn.LayerNorm
+
+        # Context encoder with normalization (input layer applied via one_hot_linear)
+        self.context_input = nn.Linear(context_dim, hidden_dim)
+        self.register_load_state_dict_pre_hook(split_context_input)
         self.context_encoder = nn.Sequential(
-            nn.Linear(context_dim, hidden_dim),
-            nn.LayerNorm(hidden_dim),
+            norm(hidden_dim),
             nn.ReLU(),
             nn.Dropout(dropout),
             nn.Linear(hidden_dim, hidden_dim),
-            nn.LayerNorm(hidden_dim),
+            norm(hidden_dim),
             nn.ReLU(),
             nn.Dropout(dropout),
         )
 
-        # Attention over context (simple self-attention)
-        self.context_attention = nn.MultiheadAttention(
-            embed_dim=hidden_dim,
-            num_heads=8,  # Increased from 4
-            dropout=dropout,
-            batch_first=True,
-        )
-        self.attn_norm = nn.LayerNorm(hidden_dim)
+        # Self-attention over a length-1 context sequence reduces to
+        # out_proj(v_proj(x)), so it is specialized to one projection.
+        self.context_proj = nn.Linear(hidden_dim, hidden_dim)
+        self.register_load_state_dict_pre_hook(fold_context_attention)
+        self.attn_norm = norm(hidden_dim)
 
         # Combine context + arm embeddings with residual
         combined_dim = hidden_dim + 2 * embed_dim
         self.combiner = nn.Sequential(
             nn.Linear(combined_dim, hidden_dim),
-            nn.LayerNorm(hidden_dim),
+            norm(hidden_dim),
             nn.ReLU(),
             nn.Dropout(dropout),
             nn.Linear(hidden_dim, hidden_dim // 2),
-            nn.LayerNorm(hidden_dim // 2),
+            norm(hidden_dim // 2),
             nn.ReLU(),
         )
 
-        # Output head: predicts P(success) and uncertainty
-        self.success_head = nn.Linear(hidden_dim // 2, 1)
-        self.uncertainty_head = nn.Linear(hidden_dim // 2, 1)
+        # Output head: predicts P(success) and uncertainty as two columns
+        self.out_head = nn.Linear(hidden_dim // 2, 2)
+        self.register_load_state_dict_pre_hook(merge_output_heads)
 
     def forward(
         self,
         context: torch.Tensor,
         arm_indices: torch.Tensor,
+        scalars: Optional[torch.Tensor] = None,
     ) -> Tuple[torch.Tensor, torch.Tensor]:
-        """Forward pass with layer normalization."""
+        """Forward pass with layer normalization (context as in one_hot_linear)."""
         # Encode context
-        ctx_encoded = self.context_encoder(context)  # (batch, hidden)
+        ctx_encoded = self.context_encoder(one_hot_linear(self.context_input, context, scalars))
 
-        # Self-attention on context with residual + norm
-        ctx_seq = ctx_encoded.unsqueeze(1)  # (batch, 1, hidden)
-        ctx_attended, _ = self.context_attention(ctx_seq, ctx_seq, ctx_seq)
-        ctx_attended = self.attn_norm(ctx_attended.squeeze(1) + ctx_encoded)  # residual
+        # Context projection (length-1 self-attention) with residual + norm
+        ctx_attended = self.attn_norm(self.context_proj(ctx_encoded) + ctx_encoded)
 
         # Get arm embeddings
         principle_emb = self.principle_embed(arm_indices[:, 0])
@@ -222,14 +378,9 @@ class NeuralPosteriorV2(nn.Module):
         combined = torch.cat([ctx_attended, principle_emb, thinker_emb], dim=1)
         hidden = self.combiner(combined)
 
-        # Outputs
-        success_logit = self.success_head(hidden)
-        success_prob = torch.sigmoid(success_logit)
-
-        uncertainty_raw = self.uncertainty_head(hidden)
-        uncertainty = F.softplus(uncertainty_raw)
-
-        return success_prob, uncertainty
+        # Raw outputs; sigmoid/softplus are applied by the loss or PosteriorOutputs
+        out = self.out_head(hidden)
+        return out[:, :1], out[:, 1:]
 
 
 # Alias for backward compatibility
@@ -262,9 +413,10 @@ class NeuralPosteriorV1(nn.Module):
         self.principle_embed = nn.Embedding(num_principles, embed_dim)
         self.thinker_embed = nn.Embedding(num_thinkers, embed_dim)
 
-        # Context encoder (MLP)
+        # Context encoder (MLP; input layer applied via one_hot_linear)
+        self.context_input = nn.Linear(context_dim, hidden_dim)
+        self.register_load_state_dict_pre_hook(split_context_input)
         self.context_encoder = nn.Sequential(
-            nn.Linear(context_dim, hidden_dim),
             nn.ReLU(),
             nn.Dropout(dropout),
             nn.Linear(hidden_dim, hidden_dim),
@@ -272,13 +424,9 @@ class NeuralPosteriorV1(nn.Module):
             nn.Dropout(dropout),
         )
 
-        # Attention over context (simple self-attention)
-        self.context_attention = nn.MultiheadAttention(
-            embed_dim=hidden_dim,
-            num_heads=4,
-            dropout=dropout,
-            batch_first=True,
-        )
+        # Length-1 self-attention == a single projection
+        self.context_proj = nn.Linear(hidden_dim, hidden_dim)
+        self.register_load_state_dict_pre_hook(fold_context_attention)
 
         # Combine context + arm embeddings
         combined_dim = hidden_dim + 2 * embed_dim
@@ -290,35 +438,32 @@ class NeuralPosteriorV1(nn.Module):
             nn.ReLU(),
         )
 
-        # Output head: predicts P(success) and uncertainty
-        self.success_head = nn.Linear(hidden_dim // 2, 1)
-        self.uncertainty_head = nn.Linear(hidden_dim // 2, 1)
+        # Output head: predicts P(success) and uncertainty as two columns
+        self.out_head = nn.Linear(hidden_dim // 2, 2)
+        self.register_load_state_dict_pre_hook(merge_output_heads)
 
     def forward(
         self,
         context: torch.Tensor,
         arm_indices: torch.Tensor,
+        scalars: Optional[torch.Tensor] = None,
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
         Forward pass.
 
         Args:
-            context: (batch, context_dim) context features
+            context: (batch, context_dim) context features, or (batch, 4)
+                one-hot column indices when scalars is given
             arm_indices: (batch, 2) [principle_idx, thinker_idx]
+            scalars: (batch, NUM_SCALAR_FEATURES) scalar features, or None
 
         Returns:
-            success_prob: (batch, 1) predicted P(success)
-            uncertainty: (batch, 1) epistemic uncertainty estimate
+            success_logit: (batch, 1) logit of P(success)
+            uncertainty_raw: (batch, 1) pre-softplus epistemic uncertainty
         """
-        batch_size = context.shape[0]
-
         # Encode context
-        ctx_encoded = self.context_encoder(context)  # (batch, hidden)
-
-        # Self-attention on context (reshape for attention)
-        ctx_seq = ctx_encoded.unsqueeze(1)  # (batch, 1, hidden)
-        ctx_attended, _ = self.context_attention(ctx_seq, ctx_seq, ctx_seq)
-        ctx_attended = ctx_attended.squeeze(1)  # (batch, hidden)
+        ctx_encoded = self.context_encoder(one_hot_linear(self.context_input, context, scalars))  # (batch, hidden)
+        ctx_attended = self.context_proj(ctx_encoded)  # (batch, hidden)
 
         # Get arm embeddings
         principle_emb = self.principle_embed(arm_indices[:, 0])  # (batch, embed)
@@ -329,105 +474,226 @@ class NeuralPosteriorV1(nn.Module):
         hidden = self.combiner(combined)
 
         # Outputs
-        success_logit = self.success_head(hidden)
-        success_prob = torch.sigmoid(success_logit)
+        out = self.out_head(hidden)
+        return out[:, :1], out[:, 1:]
 
-        uncertainty_raw = self.uncertainty_head(hidden)
-        uncertainty = F.softplus(uncertainty_raw)  # Ensure positive
 
-        return success_prob, uncertainty
+class PosteriorOutputs(nn.Module):
+    """
+    Inference wrapper mapping raw model outputs to (success_prob, uncertainty).
+
+    The networks return logits so training can use the fused, autocast-safe
+    binary_cross_entropy_with_logits; this restores the probability/softplus
+    outputs the Rust side expects from the ONNX graph.
+    """
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(
+        self,
+        context: torch.Tensor,
+        arm_indices: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        success_logit, uncertainty_raw = self.model(context, arm_indices)
+        return torch.sigmoid(success_logit), F.softplus(uncertainty_raw)
+
+
+class Int8Embedding(nn.Module):
+    """
+    Weight-only int8 embedding table with per-row scales.
+
+    Lookups gather int8 rows and dequantize on the fly; in ONNX this is two
+    Gathers and a Mul, which any runtime can execute.
+    """
+
+    def __init__(self, weight: torch.Tensor):
+        super().__init__()
+        scale = weight.abs().amax(dim=1, keepdim=True).clamp(min=1e-12) / 127
+        self.register_buffer('weight_int8', (weight / scale).round().to(torch.int8))
+        self.register_buffer('scale', scale)
+
+    @classmethod
+    def from_float(cls, embedding: nn.Embedding) -> 'Int8Embedding':
+        return cls(embedding.weight.detach())
+
+    def forward(self, indices: torch.Tensor) -> torch.Tensor:
+        return self.weight_int8[indices].float() * self.scale[indices]
+
+
+def quantize_embeddings(model: nn.Module) -> nn.Module:
+    """Swap the principle/thinker embedding tables for Int8Embedding, in place."""
+    model.principle_embed = Int8Embedding.from_float(model.principle_embed)
+    model.thinker_embed = Int8Embedding.from_float(model.thinker_embed)
+    return model
+
+
+def as_tensors(arrays: Tuple[np.ndarray, ...], pin_memory: bool = False) -> Tuple[torch.Tensor, ...]:
+    """Wrap arrays (as from NeuralBanditDataset.arrays) as tensors, pinned once if requested."""
+    tensors = tuple(torch.from_numpy(a) for a in arrays)
+    return tuple(t.pin_memory() for t in tensors) if pin_memory else tensors
+
+
+def staging_buffers(
+    tensors: Tuple[torch.Tensor, ...],
+    batch_size: int,
+    slots: int = 2,
+) -> List[Tuple[torch.Tensor, ...]]:
+    """Pinned batch-sized buffers for gathering shuffled batches, one tuple per slot."""
+    return [
+        tuple(torch.empty((batch_size, *t.shape[1:]), dtype=t.dtype).pin_memory() for t in tensors)
+        for _ in range(slots)
+    ]
+
+
+def iter_batches(
+    tensors: Tuple[torch.Tensor, ...],
+    batch_size: int,
+    shuffle: bool = False,
+    staging: Optional[List[Tuple[torch.Tensor, ...]]] = None,
+) -> Iterator[Tuple[torch.Tensor, ...]]:
+    """
+    Yield batches of the tensors (as from as_tensors).
+
+    Replaces a per-item DataLoader: each batch is one slice, or one
+    permutation gather when shuffling, instead of batch_size __getitem__
+    calls plus collation. Unshuffled batches are views, so pinned inputs
+    give pinned batches. Shuffled batches are gathered into the staging
+    buffers (if given) to stay pinned for non_blocking copies; a buffer is
+    only refilled once the copies queued from it have completed.
+    """
+    n = len(tensors[0])
+    if not shuffle:
+        for start in range(0, n, batch_size):
+            yield tuple(t[start:start + batch_size] for t in tensors)
+        return
+
+    order = torch.from_numpy(np.random.permutation(n))
+    if staging is None:
+        for start in range(0, n, batch_size):
+            rows = order[start:start + batch_size]
+            yield tuple(t[rows] for t in tensors)
+        return
+
+    copied = [torch.cuda.Event() for _ in staging]
+    for step, start in enumerate(range(0, n, batch_size)):
+        rows = order[start:start + batch_size]
+        slot = step % len(staging)
+        copied[slot].synchronize()  # no-op until first recorded
+        yield tuple(
+            torch.index_select(t, 0, rows, out=buf[:len(rows)])
+            for t, buf in zip(tensors, staging[slot])
+        )
+        # The consumer has queued this batch's host-to-device copies by now
+        copied[slot].record()
+
+
+def posterior_loss(
+    success_logit: torch.Tensor,
+    uncertainty_raw: torch.Tensor,
+    labels: torch.Tensor,
+) -> torch.Tensor:
+    """BCE plus uncertainty regularization (higher uncertainty for wrong predictions)."""
+    bce_loss = F.binary_cross_entropy_with_logits(success_logit, labels)
+    # No-grad target, so it can be built in place in a single buffer
+    pred_error = torch.sigmoid(success_logit.detach()).sub_(labels).abs_()
+    uncertainty_loss = (F.softplus(uncertainty_raw) - pred_error).pow(2).mean()
+    return bce_loss + 0.1 * uncertainty_loss
 
 
 def train_epoch(
     model: nn.Module,
-    dataloader: DataLoader,
+    batches: Iterator[Tuple[torch.Tensor, ...]],
     optimizer: torch.optim.Optimizer,
     device: torch.device,
     label_noise: float = 0.0,  # Adversarial label noise (0.0-0.15)
     label_smoothing: float = 0.0,  # Label smoothing (0.0-0.1)
+    loss_fn=posterior_loss,
+    autocast_dtype: torch.dtype = torch.float32,
 ) -> Tuple[float, float]:
     """Train for one epoch with adversarial augmentation.
 
     Args:
         label_noise: Probability of flipping labels (adversarial robustness)
         label_smoothing: Smooth labels from {0,1} to {smooth, 1-smooth}
+        loss_fn: posterior_loss, or a torch.compile'd copy of it
+        autocast_dtype: Mixed-precision dtype for the forward pass (float32 = off)
     """
     model.train()
-    total_loss = 0.0
-    correct = 0
+    # Accumulate on device; one sync per epoch instead of two per batch
+    total_loss = torch.zeros((), device=device)
+    correct = torch.zeros((), dtype=torch.long, device=device)
     total = 0
 
-    for context, arm_indices, labels in dataloader:
-        context = context.to(device)
-        arm_indices = arm_indices.to(device)
-        labels = torch.tensor(labels, dtype=torch.float32).to(device).unsqueeze(1)
+    for cat_columns, scalars, arm_indices, labels in batches:
+        cat_columns = cat_columns.to(device, non_blocking=True)
+        scalars = scalars.to(device, non_blocking=True)
+        arm_indices = arm_indices.to(device, non_blocking=True)
+        labels = labels.to(device, non_blocking=True).unsqueeze(1)
 
-        # Apply adversarial label noise (flip random labels)
+        # Apply adversarial label noise (flip random labels): y + flip * (1 - 2y)
         if label_noise > 0:
-            noise_mask = torch.rand_like(labels) < label_noise
-            labels = torch.where(noise_mask, 1.0 - labels, labels)
+            flips = (torch.rand_like(labels) < label_noise).float()
+            labels = torch.addcmul(labels, flips, 1.0 - 2.0 * labels)
 
-        # Apply label smoothing (soft labels)
+        # Apply label smoothing (soft labels); labels may still view the batch
+        # tensor, so only the add is in place
         if label_smoothing > 0:
-            labels = labels * (1.0 - label_smoothing) + 0.5 * label_smoothing
-
-        optimizer.zero_grad()
-
-        success_prob, uncertainty = model(context, arm_indices)
-
-        # Binary cross-entropy loss
-        bce_loss = F.binary_cross_entropy(success_prob, labels)
+            labels = labels.mul(1.0 - label_smoothing).add_(0.5 * label_smoothing)
 
-        # Uncertainty regularization: higher uncertainty for wrong predictions
-        pred_error = (success_prob - labels).abs()
-        uncertainty_loss = (uncertainty - pred_error).pow(2).mean()
+        optimizer.zero_grad(set_to_none=True)
 
-        loss = bce_loss + 0.1 * uncertainty_loss
+        with torch.autocast(
+            device_type=device.type,
+            dtype=autocast_dtype,
+            enabled=autocast_dtype != torch.float32,
+        ):
+            success_logit, uncertainty_raw = model(cat_columns, arm_indices, scalars)
+            loss = loss_fn(success_logit, uncertainty_raw, labels)
 
         loss.backward()
         optimizer.step()
 
-        total_loss += loss.item() * context.shape[0]
+        total_loss += loss.detach() * labels.shape[0]
 
-        # Accuracy (use original labels without smoothing for metrics)
-        preds = (success_prob > 0.5).float()
-        original_labels = (labels > 0.5).float()  # Threshold smoothed labels
-        correct += (preds == original_labels).sum().item()
+        # Accuracy (threshold smoothed labels back to {0, 1} for metrics)
+        correct += ((success_logit > 0) == (labels > 0.5)).sum()
         total += labels.shape[0]
 
-    avg_loss = total_loss / total
-    accuracy = correct / total
+    avg_loss = total_loss.item() / total
+    accuracy = correct.item() / total
     return avg_loss, accuracy
 
 
 def run_validation(
     model: nn.Module,
-    dataloader: DataLoader,
+    batches: Iterator[Tuple[torch.Tensor, ...]],
     device: torch.device,
 ) -> Tuple[float, float]:
     """Run validation on held-out set."""
     model.eval()
-    total_loss = 0.0
-    correct = 0
+    total_loss = torch.zeros((), device=device)
+    correct = torch.zeros((), dtype=torch.long, device=device)
     total = 0
 
     with torch.no_grad():
-        for context, arm_indices, labels in dataloader:
-            context = context.to(device)
-            arm_indices = arm_indices.to(device)
-            labels = torch.tensor(labels, dtype=torch.float32).to(device).unsqueeze(1)
+        for cat_columns, scalars, arm_indices, labels in batches:
+            cat_columns = cat_columns.to(device, non_blocking=True)
+            scalars = scalars.to(device, non_blocking=True)
+            arm_indices = arm_indices.to(device, non_blocking=True)
+            labels = labels.to(device, non_blocking=True).unsqueeze(1)
 
-            success_prob, _ = model(context, arm_indices)
+            success_logit, _ = model(cat_columns, arm_indices, scalars)
 
-            loss = F.binary_cross_entropy(success_prob, labels)
-            total_loss += loss.item() * context.shape[0]
+            loss = F.binary_cross_entropy_with_logits(success_logit, labels)
+            total_loss += loss * labels.shape[0]
 
-            preds = (success_prob > 0.5).float()
-            correct += (preds == labels).sum().item()
+            correct += ((success_logit > 0) == labels).sum()
             total += labels.shape[0]
 
-    avg_loss = total_loss / total
-    accuracy = correct / total
+    avg_loss = total_loss.item() / total
+    accuracy = correct.item() / total
     return avg_loss, accuracy
 
 
@@ -435,14 +701,30 @@ def export_onnx(
     model: nn.Module,
     context_dim: int,
     output_path: str,
+    batch_size: Optional[int] = None,
 ):
-    """Export model to ONNX format for Rust integration."""
+    """
+    Export model to ONNX format for Rust integration.
+
+    By default the batch axis is dynamic. With batch_size the graph is
+    specialized to that batch, so ORT can fold shapes and preselect kernels.
+    """
+    model = PosteriorOutputs(model)  # Rust consumes probabilities, not logits
     model.eval()
     model.cpu()  # Export from CPU for compatibility
 
-    # Create dummy inputs matching model dimensions
-    dummy_context = torch.randn(1, context_dim)
-    dummy_arm = torch.tensor([[0, 0]], dtype=torch.long)
+    # Create dummy inputs matching model dimensions (contiguous float32/int64)
+    dummy_context = torch.randn(batch_size or 1, context_dim)
+    dummy_arm = torch.zeros((batch_size or 1, 2), dtype=torch.long)
+    if batch_size is None:
+        dynamic_axes = {
+            'context': {0: 'batch_size'},
+            'arm_indices': {0: 'batch_size'},
+            'success_prob': {0: 'batch_size'},
+            'uncertainty': {0: 'batch_size'},
+        }
+    else:
+        dynamic_axes = None
 
     # Use legacy tracer-based export (more reliable)
     torch.onnx.export(
@@ -451,18 +733,31 @@ def export_onnx(
         output_path,
         input_names=['context', 'arm_indices'],
         output_names=['success_prob', 'uncertainty'],
-        dynamic_axes={
-            'context': {0: 'batch_size'},
-            'arm_indices': {0: 'batch_size'},
-            'success_prob': {0: 'batch_size'},
-            'uncertainty': {0: 'batch_size'},
-        },
+        dynamic_axes=dynamic_axes,
         opset_version=14,
         dynamo=False,  # Use legacy tracer, not dynamo
     )
     print(f"Exported ONNX model to: {output_path}")
 
 
+def quantize_onnx(onnx_path: str) -> bool:
+    """Dynamic int8 quantization of the exported graph's Linear weights, in place."""
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError:
+        print("Warning: onnxruntime not installed, skipping --quantize. Install with: pip install onnxruntime")
+        return False
+
+    quantize_dynamic(
+        onnx_path,
+        onnx_path,
+        op_types_to_quantize=['MatMul', 'Gemm'],
+        weight_type=QuantType.QInt8,
+    )
+    print(f"Quantized Linear weights to int8: {onnx_path}")
+    return True
+
+
 def save_vocab(dataset: NeuralBanditDataset, output_path: str):
     """Save vocabulary mappings for inference."""
     vocab = {
@@ -478,6 +773,40 @@ def save_vocab(dataset: NeuralBanditDataset, output_path: str):
     print(f"Saved vocabulary to: {output_path}")
 
 
+def build_model(args: argparse.Namespace, dataset: NeuralBanditDataset) -> nn.Module:
+    """Construct the (uncompiled) posterior network selected by the CLI flags."""
+    if args.v1:
+        return NeuralPosteriorV1(
+            context_dim=dataset.context_dim,
+            num_principles=dataset.num_principles,
+            num_thinkers=dataset.num_thinkers,
+            embed_dim=64,
+            hidden_dim=128,
+        )
+    return NeuralPosteriorV2(
+        context_dim=dataset.context_dim,
+        num_principles=dataset.num_principles,
+        num_thinkers=dataset.num_thinkers,
+        embed_dim=args.embed_dim,
+        hidden_dim=args.hidden_dim,
+        rms_norm=args.rms_norm,
+    )
+
+
+def batch_sizes(value: str) -> List[int]:
+    """argparse type for a comma-separated list of positive batch sizes, e.g. '1,32,128'."""
+    sizes = []
+    for item in value.split(','):
+        try:
+            size = int(item)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid batch size {item!r} in {value!r}")
+        if size <= 0:
+            raise argparse.ArgumentTypeError(f"batch sizes must be positive, got {size} in {value!r}")
+        sizes.append(size)
+    return sizes
+
+
 def main():
     parser = argparse.ArgumentParser(description='Train Neural Bandit for 100minds (V2 SOTA)')
     parser.add_argument('--data', type=str, required=True, help='Path to training JSONL file')
@@ -496,7 +825,19 @@ def main():
     parser.add_argument('--label-smoothing', type=float, default=0.05, help='Label smoothing (0.0-0.1)')
     parser.add_argument('--early-stop', type=int, default=5, help='Early stopping patience (0=disabled)')
     parser.add_argument('--v1', action='store_true', help='Use V1 architecture (for comparison)')
+    parser.add_argument('--rms-norm', action='store_true', help='V2: RMSNorm instead of LayerNorm')
+    compile_group = parser.add_mutually_exclusive_group()
+    compile_group.add_argument('--compile', action='store_true', help='torch.compile the model and loss (not on MPS)')
+    compile_group.add_argument('--compile-regional', action='store_true',
+                               help='torch.compile the context encoder and combiner blocks separately (not on MPS)')
+    parser.add_argument('--quantize-embed', action='store_true', help='Int8 weight-only embeddings in the ONNX export')
+    parser.add_argument('--quantize', action='store_true', help='Dynamic int8 Linear layers in the ONNX export')
+    parser.add_argument('--onnx-batch-sizes', type=batch_sizes, default=None,
+                        help='With --export, also export fixed-batch graphs, e.g. 1,32,128 '
+                             '(written as <export>.b<N>.onnx)')
     args = parser.parse_args()
+    if args.onnx_batch_sizes and not args.export:
+        parser.error('--onnx-batch-sizes requires --export')
 
     if not TORCH_AVAILABLE:
         print("Error: PyTorch is required. Install with: pip install torch")
@@ -509,48 +850,70 @@ def main():
     # Split into train/val
     val_size = int(len(dataset) * args.val_split)
     train_size = len(dataset) - val_size
-    train_dataset, val_dataset = torch.utils.data.random_split(
-        dataset, [train_size, val_size]
-    )
+    split = np.random.permutation(len(dataset))
+    train_arrays = dataset.arrays(split[:train_size])
+    val_arrays = dataset.arrays(split[train_size:])
 
-    train_loader = DataLoader(train_dataset, batch_size=args.batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=args.batch_size)
-
-    print(f"Train: {len(train_dataset)}, Val: {len(val_dataset)}")
+    print(f"Train: {train_size}, Val: {val_size}")
 
     # Create model
     device = torch.device('cuda' if torch.cuda.is_available() else 'mps' if torch.backends.mps.is_available() else 'cpu')
     print(f"Using device: {device}")
+    # BF16 needs no GradScaler; elsewhere train in FP32
+    autocast_dtype = torch.bfloat16 if device.type == 'cuda' else torch.float32
+    # Shuffled train batches are gathered into reused pinned buffers, so only
+    # the (small, sequentially sliced) validation split is pinned itself
+    pin_memory = device.type == 'cuda'
+    train_tensors = as_tensors(train_arrays)
+    val_tensors = as_tensors(val_arrays, pin_memory)
+    train_staging = staging_buffers(train_tensors, args.batch_size) if pin_memory else None
+    # TF32 tensor cores for the remaining FP32 matmuls (validation) and
+    # cuDNN autotuning; no effect off Ampere+ CUDA
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision('high')
 
     # Choose model architecture
     if args.v1:
         print("Using V1 architecture (original)")
-        model = NeuralPosteriorV1(
-            context_dim=dataset.context_dim,
-            num_principles=dataset.num_principles,
-            num_thinkers=dataset.num_thinkers,
-            embed_dim=64,
-            hidden_dim=128,
-        ).to(device)
     else:
         print("Using V2 architecture (SOTA 2026)")
-        model = NeuralPosteriorV2(
-            context_dim=dataset.context_dim,
-            num_principles=dataset.num_principles,
-            num_thinkers=dataset.num_thinkers,
-            embed_dim=args.embed_dim,
-            hidden_dim=args.hidden_dim,
-        ).to(device)
+    model = build_model(args, dataset).to(device)
 
     print(f"Model parameters: {sum(p.numel() for p in model.parameters()):,}")
 
+    # Compiled wrappers are only used for the training/validation loops;
+    # `model` stays the plain module for checkpoints and ONNX export.
+    train_model, loss_fn = model, posterior_loss
+    if args.compile and device.type != 'mps':
+        torch._dynamo.config.cache_size_limit = 128
+        train_model = torch.compile(model, mode='reduce-overhead', fullgraph=True, dynamic=False)
+        loss_fn = torch.compile(posterior_loss, fullgraph=True, dynamic=False)
+        print("Compiled model with torch.compile (reduce-overhead)")
+    elif args.compile_regional and device.type != 'mps':
+        # Per-block graphs: faster cold start and no recompiles when the
+        # surrounding Python (indexing, concat, heads) changes
+        torch._dynamo.config.cache_size_limit = 128
+        model.context_encoder.compile(mode='reduce-overhead')
+        model.combiner.compile(mode='reduce-overhead')
+        loss_fn = torch.compile(posterior_loss, fullgraph=True, dynamic=False)
+        print("Compiled context encoder and combiner with torch.compile (reduce-overhead)")
+
     # Optimizer
-    optimizer = torch.optim.AdamW(model.parameters(), lr=args.lr, weight_decay=0.01)
+    # Fused AdamW updates every parameter in one kernel (CUDA, PyTorch >= 2.0)
+    try:
+        optimizer = torch.optim.AdamW(
+            model.parameters(), lr=args.lr, weight_decay=0.01, fused=device.type == 'cuda',
+        )
+    except TypeError:
+        optimizer = torch.optim.AdamW(model.parameters(), lr=args.lr, weight_decay=0.01, foreach=True)
     scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=args.epochs)
 
     # Training loop with early stopping
     best_val_acc = 0.0
     patience_counter = 0
+    saved_checkpoint = False
 
     print("\n" + "="*60)
     print("Training Neural Posterior Network (V2 SOTA)")
@@ -560,12 +923,16 @@ def main():
     print("="*60)
 
     for epoch in range(args.epochs):
+        train_batches = iter_batches(train_tensors, args.batch_size, shuffle=True, staging=train_staging)
+        val_batches = iter_batches(val_tensors, args.batch_size)
         train_loss, train_acc = train_epoch(
-            model, train_loader, optimizer, device,
+            train_model, train_batches, optimizer, device,
             label_noise=args.label_noise,
             label_smoothing=args.label_smoothing,
+            loss_fn=loss_fn,
+            autocast_dtype=autocast_dtype,
         )
-        val_loss, val_acc = run_validation(model, val_loader, device)
+        val_loss, val_acc = run_validation(train_model, val_batches, device)
         scheduler.step()
 
         print(f"Epoch {epoch+1:2d}/{args.epochs}: "
@@ -584,7 +951,9 @@ def main():
                 'num_principles': dataset.num_principles,
                 'num_thinkers': dataset.num_thinkers,
                 'architecture': 'v1' if args.v1 else 'v2',
+                'rms_norm': args.rms_norm,
             }, args.checkpoint)
+            saved_checkpoint = True
             print(f"  -> Saved checkpoint (best val acc: {val_acc:.3f})")
         else:
             patience_counter += 1
@@ -602,10 +971,28 @@ def main():
 
     # Export ONNX if requested
     if args.export:
-        # Load best checkpoint
-        checkpoint = torch.load(args.checkpoint, weights_only=False)
-        model.load_state_dict(checkpoint['model_state_dict'])
+        # Best checkpoint of this run, else the trained weights as they are
+        if saved_checkpoint:
+            checkpoint = torch.load(args.checkpoint, weights_only=False, map_location='cpu')
+            state_dict = checkpoint['model_state_dict']
+        else:
+            state_dict = model.state_dict()
+        # Export from a fresh module: regionally compiled blocks cannot go
+        # through the tracing exporter
+        model = build_model(args, dataset)
+        model.load_state_dict(state_dict)
+        if args.quantize_embed:
+            quantize_embeddings(model)
+        export_paths = [args.export]
         export_onnx(model, dataset.context_dim, args.export)
+        if args.onnx_batch_sizes:
+            for batch_size in args.onnx_batch_sizes:
+                path = str(Path(args.export).with_suffix(f'.b{batch_size}.onnx'))
+                export_onnx(model, dataset.context_dim, path, batch_size=batch_size)
+                export_paths.append(path)
+        if args.quantize:
+            for path in export_paths:
+                quantize_onnx(path)
 
     # Save vocabulary if requested
     if args.save_vocab: